@@ -1,6 +1,21 @@
 import re
+import sys
+
+import binarycache
+import mappedsource
+from source import CHUNK_SIZE, read_chunks
+from tokenstream import TokenStream
+from tokentable import TokenTable
+
+# Number runs are found with one match each and sliced from the text,
+# instead of built up a character at a time through advance()
+NUMBER_RUN = re.compile(r'[\d.]*')
+SPACE_RUN = re.compile(r'\s*')
+
 
 class Token:
+    __slots__ = ("token_type", "value")
+
     def __init__(self, token_type, value):
         self.token_type = token_type
         self.value = value
@@ -9,62 +24,94 @@ class Token:
         return f"| {self.token_type:<18}| {self.value:<11}|"
 
 
+# Tokens are never modified after lexing, so every occurrence of an
+# operator or parenthesis shares one Token. This table (and HANDLERS below)
+# is built once at import and never changed.
+PUNCTUATION = {char: Token(token_type, char) for char, token_type in (
+    ("+", "PLUS"), ("-", "MINUS"), ("*", "MULTIPLY"), ("/", "DIVIDE"), ("(", "LPAREN"), (")", "RPAREN"),
+)}
+
+
 class Lexer:
-    def __init__(self, input_text):
-        self.input_text = input_text
-        self.position = 0
-        self.current_char = self.input_text[self.position]
+    def __init__(self, input_text, chunk_size=CHUNK_SIZE):
+        # input_text may also be a file object or an iterable of chunks;
+        # only the chunk under the cursor is held in memory.
+        self.chunks = read_chunks(input_text, chunk_size)
+        self.input_text = ""
+        self.index = -1  # offset inside the current chunk
+        self.position = -1  # offset inside the whole input
+        self.current_char = None
+        self.advance()
 
     def advance(self):
         self.position += 1
-        if self.position < len(self.input_text):
-            self.current_char = self.input_text[self.position]
-        else:
-            self.current_char = None
-
-    def lex(self):
-        tokens = []
+        self.index += 1
+        while self.index >= len(self.input_text):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.current_char = None
+                return
+            self.input_text = chunk
+            self.index = 0
+        self.current_char = self.input_text[self.index]
+
+    # The run of pattern characters from the cursor, one match per chunk; it
+    # only carries on into the next chunk if it reached the end of this one
+    def scan_run(self, pattern):
+        text = self.input_text
+        start = self.index
+        end = pattern.match(text, start).end()
+        if end < len(text):
+            self.position += end - start
+            self.index = end
+            self.current_char = text[end]
+            return text[start:end]
+
+        parts = []
         while self.current_char is not None:
-            if self.current_char.isspace():
-                self.advance()
-            elif self.current_char.isdigit() or self.current_char == '.':
-                tokens.append(self.parse_number())
-            elif self.current_char == "+":
-                tokens.append(Token("PLUS", self.current_char))
-                self.advance()
-            elif self.current_char == "-":
-                tokens.append(Token("MINUS", self.current_char))
-                self.advance()
-            elif self.current_char == "*":
-                tokens.append(Token("MULTIPLY", self.current_char))
-                self.advance()
-            elif self.current_char == "/":
-                tokens.append(Token("DIVIDE", self.current_char))
-                self.advance()
-            elif self.current_char == "(":
-                tokens.append(Token("LPAREN", self.current_char))
-                self.advance()
-            elif self.current_char == ")":
-                tokens.append(Token("RPAREN", self.current_char))
-                self.advance()
-            else:
-                raise Exception(f"Invalid character: {self.current_char}")
-
+            end = pattern.match(self.input_text, self.index).end()
+            parts.append(self.input_text[self.index:end])
+            at_chunk_end = end == len(self.input_text)
+            self.position += end - self.index - 1
+            self.index = end - 1
+            self.advance()
+            if not at_chunk_end:
+                break
+        return "".join(parts)
+
+    def lex(self, tokens=None):
+        if tokens is None:
+            tokens = []
+        for token in self.iter_tokens():
+            tokens.append(token)
         return tokens
 
-    def parse_number(self):
-        result = ""
-        decimal_count = 0
+    def iter_tokens(self):
+        handlers = HANDLERS
+        while self.current_char is not None:
+            handler = handlers.get(self.current_char) or char_handler(self.current_char)
+            token = handler(self)
+            if token is not None:
+                yield token
 
-        while self.current_char is not None and (self.current_char.isdigit() or self.current_char == '.'):
-            result += self.current_char
+    # a single space is one advance(); longer runs one scan
+    def skip_space(self):
+        self.advance()
+        if self.current_char is not None and self.current_char.isspace():
+            self.scan_run(SPACE_RUN)
 
-            if self.current_char == '.':
-                decimal_count += 1
-                if decimal_count > 1:
-                    raise Exception("Invalid number")
+    def punctuation(self):
+        token = PUNCTUATION[self.current_char]
+        self.advance()
+        return token
 
-            self.advance()
+    def invalid(self):
+        raise Exception(f"Invalid character: {self.current_char}")
+
+    def parse_number(self):
+        result = self.scan_run(NUMBER_RUN)
+        if result.count('.') > 1:
+            raise Exception("Invalid number")
 
         if '.' in result:
             return Token("FLOAT", float(result))
@@ -72,10 +119,63 @@ class Lexer:
             return Token("INT", int(result))
 
 
+# The Lexer method that lexes a token starting with char
+def char_handler(char):
+    if char in PUNCTUATION:
+        return Lexer.punctuation
+    elif char.isspace():
+        return Lexer.skip_space
+    elif char.isdigit() or char == '.':
+        return Lexer.parse_number
+    else:
+        return Lexer.invalid
+
+
+# Precomputed for ASCII; other characters go through char_handler(). A
+# plain space, the most common character, skips straight to advance().
+HANDLERS = {chr(code): char_handler(chr(code)) for code in range(128)}
+HANDLERS[" "] = Lexer.advance
+
+
+# Byte-level equivalent of Lexer.lex() for mmap'd files (see mappedsource.py)
+MAPPED_PATTERN = re.compile(
+    rb'(?P<SKIP>\s+)|(?P<NUMBER>[\d.]+)|(?P<PLUS>\+)|(?P<MINUS>-)|(?P<MULTIPLY>\*)'
+    rb'|(?P<DIVIDE>/)|(?P<LPAREN>\()|(?P<RPAREN>\))'
+)
+
+
+def mapped_token_type(kind, text):
+    if kind == "NUMBER":
+        if text.count(b'.') > 1:
+            raise Exception("Invalid number")
+        return "FLOAT" if b'.' in text else "INT"
+    return kind
+
+
+def lex_buffer(data):
+    return mappedsource.lex_buffer(data, MAPPED_PATTERN, mapped_token_type, {"INT": int, "FLOAT": float})
+
+
+def lex_file(path):
+    return lex_buffer(mappedsource.open_mapped(path))
+
+
+# Tokens from the on-disk cache (binarycache.py) if this source was lexed
+# before by the same lexer, otherwise lexed and stored. The spec is the whole
+# module: the lexer also depends on the tables and handlers around it.
+def lex_cached(input_text, cache):
+    spec = binarycache.spec_digest(sys.modules[__name__])
+    tokens = cache.load_tokens("Eight.tokens", input_text, spec)
+    if tokens is None:
+        tokens = Lexer(input_text).lex()
+        cache.store_tokens("Eight.tokens", input_text, spec, tokens)
+    return tokens
+
+
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.current_token = self.tokens.pop(0) if tokens else None
+        self.tokens = TokenStream(tokens)
+        self.current_token = self.tokens.advance()
 
     def error(self):
         print("Invalid syntax")
@@ -83,7 +183,7 @@ class Parser:
 
     def eat(self, token_type):
         if self.current_token.token_type == token_type:
-            self.current_token = self.tokens.pop(0) if self.tokens else None
+            self.current_token = self.tokens.advance()
         else:
             self.error()
 
@@ -140,13 +240,10 @@ def main():
 
     # Display Token Table
     print("\nToken Table:")
-    print("| Type              | Value      |")
-    print("|-------------------|------------|")
-    for token in tokens:
-        print(token)
+    TokenTable(tokens).write(sys.stdout)
 
     # Parsing and Evaluation
-    parser = Parser(tokens.copy())
+    parser = Parser(tokens)
     result = parser.expr()
     print("\nOutput:", result)
 
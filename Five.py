@@ -1,4 +1,7 @@
 import re
+import sys
+
+from tokentable import TokenTable
 
 class Node:
     def __init__(self, value):
@@ -19,30 +22,64 @@ class Token:
     def __repr__(self):
         return f"Token({self.type}, {self.value})"
 
-def lexer(program):
-    token_types = {
-        "KEYWORD": {"int", "float", "char", "double", "if", "else", "while", "for", "switch", "return"},
-        "IDENTIFIER": r'[a-zA-Z_]\w*',
-        "OPERATOR": r'[-+*/()=]',
-        "INTEGER": r'\d+',
-        "FLOAT": r'\d+\.\d+',
-        "SPECIAL_CHARACTER": r'[{};,]',
-        "WHITESPACE": r'\s+',
-    }
+TOKEN_TYPES = {
+    "KEYWORD": {"int", "float", "char", "double", "if", "else", "while", "for", "switch", "return"},
+    "IDENTIFIER": r'[a-zA-Z_]\w*',
+    "OPERATOR": r'[-+*/()=]',
+    "INTEGER": r'\d+',
+    "FLOAT": r'\d+\.\d+',
+    "SPECIAL_CHARACTER": r'[{};,]',
+    "WHITESPACE": r'\s+',
+}
+
+# Single-character class each regex token type can start with
+FIRST_CHARS = {
+    "IDENTIFIER": r'[a-zA-Z_]',
+    "OPERATOR": r'[-+*/()=]',
+    "INTEGER": r'\d',
+    "FLOAT": r'\d',
+    "SPECIAL_CHARACTER": r'[{};,]',
+    "WHITESPACE": r'\s',
+}
+
+
+class LexerSpec:
+    # Compiled once and never mutated afterwards, so one spec can be shared
+    # between lexer calls and threads.
+    def __init__(self, token_types, first_chars):
+        self.patterns = []
+        starts = {}
+        for type, pattern in token_types.items():
+            if isinstance(pattern, set):
+                regex = re.compile(fr'\b(?:{"|".join(re.escape(v) for v in pattern)})\b')
+                starts[type] = lambda ch, values=pattern: any(v.startswith(ch) for v in values)
+            else:
+                regex = re.compile(pattern)
+                starts[type] = re.compile(first_chars[type]).fullmatch
+            self.patterns.append((type, regex))
+        self.patterns = tuple(self.patterns)
+
+        # ASCII characters dispatch to the patterns that can start with them,
+        # in TOKEN_TYPES order; anything else falls back to every pattern.
+        self.dispatch = {}
+        for ch in map(chr, range(128)):
+            self.dispatch[ch] = tuple((type, regex) for type, regex in self.patterns if starts[type](ch))
+
+    def candidates(self, ch):
+        return self.dispatch.get(ch, self.patterns)
+
 
+LEXER_SPEC = LexerSpec(TOKEN_TYPES, FIRST_CHARS)
+
+
+def lexer(program, spec=LEXER_SPEC):
     tokens = []
     i = 0
 
     while i < len(program):
         match = None
 
-        for type, pattern in token_types.items():
-            if isinstance(pattern, set):
-                values = pattern
-                regex = re.compile(fr'\b(?:{"|".join(re.escape(v) for v in values)})\b')
-            else:
-                regex = re.compile(pattern)
-
+        for type, regex in spec.candidates(program[i]):
             match = regex.match(program, i)
             if match:
                 value = match.group(0)
@@ -129,11 +166,10 @@ if __name__ == "__main__":
 
     # Display token table (excluding whitespaces)
     print("\nToken Table:")
-    print("| Type              | Value      |")
-    print("|-------------------|------------|")
-    for token in tokens:
-        if token.type != 'WHITESPACE':
-            print(f"| {token.type:<17} | {token.value:<10} |")
+    TokenTable(
+        tokens, header="| Type              | Value      |\n|-------------------|------------|",
+        row=lambda token: f"| {token.type:<17} | {token.value:<10} |", skip={'WHITESPACE'},
+    ).write(sys.stdout)
 
     # Count and display the number of whitespaces
     num_whitespaces = sum(1 for token in tokens if token.type == 'WHITESPACE')
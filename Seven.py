@@ -1,7 +1,14 @@
 # lexer.py
+import ast as py_ast
+import re
+from array import array
+from bisect import bisect_left
 from collections import namedtuple
+from functools import lru_cache
 
-Token = namedtuple('Token', ['type', 'value', 'pos_start', 'pos_end'])
+import binarycache
+
+Token = namedtuple('Token', ['type', 'value', 'pos_start', 'pos_end'], defaults=(None, None))
 
 TT_INT = 'INT'
 TT_FLOAT = 'FLOAT'
@@ -11,14 +18,58 @@ TT_MUL = 'MUL'
 TT_DIV = 'DIV'
 TT_LPAREN = 'LPAREN'
 TT_RPAREN = 'RPAREN'
+TT_IDENTIFIER = 'IDENTIFIER'
 TT_EOF = 'EOF'
 
 DIGITS = '0123456789'
+LETTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+
+# Number and identifier runs, found with one match each and sliced from the
+# text. A number takes at most one '.', as the character loop did.
+NUMBER_RUN = re.compile(r'[0-9]*(?:\.[0-9]*)?')
+IDENTIFIER_RUN = re.compile(r'[A-Za-z0-9_]*')
+
+
+class LineIndex:
+    # Offsets of the text's '\n' characters, in order. Expressions are one
+    # line ('\n' is an illegal character), so the Lexer only fills this in
+    # when it stops on an error, from there to the end of the text. Tokens
+    # keep plain int offsets; the line and column of an offset are looked up
+    # here with a bisect when a diagnostic needs them.
+    def __init__(self, newlines=None):
+        self.newlines = array('q') if newlines is None else newlines
+
+    @classmethod
+    def from_text(cls, text):
+        lines = cls()
+        lines.add_rest(text, 0)
+        return lines
+
+    # Records the '\n' characters from start to the end of the text
+    def add_rest(self, text, start):
+        newlines = self.newlines
+        offset = text.find('\n', start)
+        while offset >= 0:
+            newlines.append(offset)
+            offset = text.find('\n', offset + 1)
+
+    # 0-based line and column of an offset
+    def line_col(self, offset):
+        line = bisect_left(self.newlines, offset)
+        return line, offset - self.line_start(line)
+
+    def line_start(self, line):
+        return self.newlines[line - 1] + 1 if line else 0
+
+    # None for the last line, which runs to the end of the text
+    def line_end(self, line):
+        return self.newlines[line] if line < len(self.newlines) else None
 
 
 class Lexer:
-    def __init__(self, text):
+    def __init__(self, text, lines=None):
         self.text = text
+        self.lines = LineIndex() if lines is None else lines
         self.pos = -1
         self.current_char = None
         self.advance()
@@ -31,6 +82,10 @@ class Lexer:
         else:
             self.current_char = None
 
+    def skip_to(self, pos):
+        self.pos = pos
+        self.current_char = self.text[pos] if pos < len(self.text) else None
+
     def make_tokens(self):
         tokens = []
 
@@ -39,51 +94,52 @@ class Lexer:
                 self.advance()
             elif self.current_char in DIGITS:
                 tokens.append(self.make_number())
+            elif self.current_char in LETTERS:
+                tokens.append(self.make_identifier())
             elif self.current_char == '+':
-                tokens.append(Token(TT_PLUS, '+'))
+                tokens.append(Token(TT_PLUS, '+', self.pos, self.pos + 1))
                 self.advance()
             elif self.current_char == '-':
-                tokens.append(Token(TT_MINUS, '-'))
+                tokens.append(Token(TT_MINUS, '-', self.pos, self.pos + 1))
                 self.advance()
             elif self.current_char == '*':
-                tokens.append(Token(TT_MUL, '*'))
+                tokens.append(Token(TT_MUL, '*', self.pos, self.pos + 1))
                 self.advance()
             elif self.current_char == '/':
-                tokens.append(Token(TT_DIV, '/'))
+                tokens.append(Token(TT_DIV, '/', self.pos, self.pos + 1))
                 self.advance()
             elif self.current_char == '(':
-                tokens.append(Token(TT_LPAREN, '('))
+                tokens.append(Token(TT_LPAREN, '(', self.pos, self.pos + 1))
                 self.advance()
             elif self.current_char == ')':
-                tokens.append(Token(TT_RPAREN, ')'))
+                tokens.append(Token(TT_RPAREN, ')', self.pos, self.pos + 1))
                 self.advance()
             else:
                 pos_start = self.pos
                 char = self.current_char
                 self.advance()
+                self.lines.add_rest(self.text, pos_start)
                 return [], Exception(f"Illegal character '{char}'", pos_start, self.pos)
 
-        tokens.append(Token(TT_EOF, None))
+        tokens.append(Token(TT_EOF, None, self.pos, self.pos + 1))
         return tokens, None
 
     def make_number(self):
-        num_str = ''
-        dot_count = 0
         pos_start = self.pos
+        self.skip_to(NUMBER_RUN.match(self.text, pos_start).end())
+        num_str = self.text[pos_start:self.pos]
 
-        while self.current_char is not None and self.current_char in DIGITS + '.':
-            if self.current_char == '.':
-                if dot_count == 1:
-                    break
-                dot_count += 1
-            num_str += self.current_char
-            self.advance()
-
-        if dot_count == 0:
+        if '.' not in num_str:
             return Token(TT_INT, int(num_str), pos_start, self.pos)
         else:
             return Token(TT_FLOAT, float(num_str), pos_start, self.pos)
 
+    def make_identifier(self):
+        pos_start = self.pos
+        self.skip_to(IDENTIFIER_RUN.match(self.text, pos_start).end())
+
+        return Token(TT_IDENTIFIER, self.text[pos_start:self.pos], pos_start, self.pos)
+
 
 # parser.py
 class ParseResult:
@@ -141,6 +197,10 @@ class Parser:
             res.register(self.advance())
             return res.success(NumberNode(token.value))
 
+        elif token.type == TT_IDENTIFIER:
+            res.register(self.advance())
+            return res.success(VariableNode(token.value))
+
         elif token.type == TT_LPAREN:
             res.register(self.advance())
             expr = res.register(self.expr())
@@ -152,13 +212,13 @@ class Parser:
             else:
                 return res.failure(Exception("Expected ')'", self.current_token.pos_start, self.current_token.pos_end))
 
-        return res.failure(Exception("Expected int, float, '+', '-', or '('", token.pos_start, token.pos_end))
+        return res.failure(Exception("Expected int, float, identifier, '+', '-', or '('", token.pos_start, token.pos_end))
 
     def term(self):
         return self.bin_op(self.factor, (TT_MUL, TT_DIV))
 
     def expr(self):
-        return self.bin_op(self.term, (TT_PLUS, TTDIV))
+        return self.bin_op(self.term, (TT_PLUS, TT_MINUS))
 
     def bin_op(self, func, ops):
         res = ParseResult()
@@ -195,9 +255,217 @@ class OperationNode:
         return f'({self.left}, {self.op}, {self.right})'
 
 
+class VariableNode:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f'{self.name}'
+
+
+# evaluator.py
+def apply_op(op, left, right):
+    if op == TT_PLUS:
+        return left + right
+    elif op == TT_MINUS:
+        return left - right
+    elif op == TT_MUL:
+        return left * right
+    else:
+        return left / right
+
+
+def interpret(node, variables=None):
+    if isinstance(node, NumberNode):
+        return node.value
+    if isinstance(node, VariableNode):
+        return variables[node.name]
+
+    left = interpret(node.left, variables)
+    if node.right is None:
+        return -left if node.op.type == TT_MINUS else +left
+    return apply_op(node.op.type, left, interpret(node.right, variables))
+
+
+BINARY_OPS = {TT_PLUS: py_ast.Add, TT_MINUS: py_ast.Sub, TT_MUL: py_ast.Mult, TT_DIV: py_ast.Div}
+UNARY_OPS = {TT_PLUS: py_ast.UAdd, TT_MINUS: py_ast.USub}
+
+
+def variable_names(node, names=None):
+    if names is None:
+        names = set()
+    if isinstance(node, VariableNode):
+        names.add(node.name)
+    elif isinstance(node, OperationNode):
+        variable_names(node.left, names)
+        if node.right is not None:
+            variable_names(node.right, names)
+    return names
+
+
+# OperationNodes reached through more than one parent (only after optimize())
+def shared_nodes(node):
+    seen, shared = set(), set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if not isinstance(current, OperationNode):
+            continue
+        if id(current) in seen:
+            shared.add(id(current))
+            continue
+        seen.add(id(current))
+        stack.append(current.left)
+        if current.right is not None:
+            stack.append(current.right)
+    return shared
+
+
+# Shared nodes are computed once: the first occurrence (leftmost, so evaluated
+# first) binds a temporary with :=, later occurrences just load it. Variables
+# load the parameter params gives for their source name.
+def to_python_ast(node, temps, bound, params):
+    if isinstance(node, NumberNode):
+        return py_ast.Constant(node.value)
+    if isinstance(node, VariableNode):
+        return py_ast.Name(params[node.name], py_ast.Load())
+
+    name = temps.get(id(node)) if temps else None
+    if name is not None and id(node) in bound:
+        return py_ast.Name(name, py_ast.Load())
+
+    if node.right is None:
+        expr = py_ast.UnaryOp(UNARY_OPS[node.op.type](), to_python_ast(node.left, temps, bound, params))
+    else:
+        left = to_python_ast(node.left, temps, bound, params)
+        expr = py_ast.BinOp(left, BINARY_OPS[node.op.type](), to_python_ast(node.right, temps, bound, params))
+
+    if name is not None:
+        bound.add(id(node))
+        return py_ast.NamedExpr(py_ast.Name(name, py_ast.Store()), expr)
+    return expr
+
+
+# Turns an AST into a plain Python function; its parameters are the
+# expression's variables in sorted order (or the given names), available as
+# func.variables. Parameters are named v0, v1, ... rather than after the
+# variables, since a source name such as None or True is not a valid one.
+def compile_node(node, names=None):
+    names = sorted(variable_names(node)) if names is None else list(names)
+    params = {name: f'v{i}' for i, name in enumerate(names)}
+    args = py_ast.arguments(
+        posonlyargs=[], args=[py_ast.arg(param) for param in params.values()], kwonlyargs=[],
+        kw_defaults=[], defaults=[],
+    )
+    temps = {node_id: f't{i}' for i, node_id in enumerate(shared_nodes(node))}
+    tree = py_ast.Expression(py_ast.Lambda(args, to_python_ast(node, temps, set(), params)))
+    func = eval(compile(py_ast.fix_missing_locations(tree), '<expression>', 'eval'), {})
+    func.variables = tuple(names)
+    return func
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(text):
+    node, error = run(text)
+    if error:
+        raise error
+    return compile_node(optimize(node.node)[0])
+
+
+# optimizer.py
+class Optimizer:
+    # Folds constant subtrees, drops identities (x*1, 1*x, x+0, 0+x, x-0, +x)
+    # and hash-conses the result: structurally equal subtrees become one
+    # shared node, so the tree turns into a DAG.
+    def __init__(self):
+        self.nodes = {}
+        self.int_valued = {}  # id(node) -> whether it always evaluates to an int
+
+    def intern(self, key, make):
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = make()
+        return node
+
+    def number(self, value):
+        return self.intern((NumberNode, repr(value)), lambda: NumberNode(value))
+
+    def optimize(self, node):
+        if isinstance(node, NumberNode):
+            return self.number(node.value)
+        if isinstance(node, VariableNode):
+            return self.intern((VariableNode, node.name), lambda: VariableNode(node.name))
+
+        op = node.op.type
+        left = self.optimize(node.left)
+        if node.right is None:
+            if isinstance(left, NumberNode):
+                return self.number(-left.value if op == TT_MINUS else +left.value)
+            if op == TT_PLUS:
+                return left
+            return self.intern((op, id(left)), lambda: OperationNode(left, node.op))
+
+        right = self.optimize(node.right)
+        if isinstance(left, NumberNode) and isinstance(right, NumberNode):
+            if not (op == TT_DIV and right.value == 0):  # leave the error to run time
+                return self.number(apply_op(op, left.value, right.value))
+        # x + 0 is not x for x = -0.0 (it gives 0.0), so that one needs an int x;
+        # x - 0 and x * 1 are exact for floats too
+        if op == TT_MINUS and is_int(right, 0) or op == TT_MUL and is_int(right, 1):
+            return left
+        if op == TT_PLUS and is_int(right, 0) and self.is_int_valued(left):
+            return left
+        if op == TT_PLUS and is_int(left, 0) and self.is_int_valued(right):
+            return right
+        if op == TT_MUL and is_int(left, 1):
+            return right
+        return self.intern((op, id(left), id(right)), lambda: OperationNode(left, node.op, right))
+
+    # Numbers and +, -, * over ints; variables can hold floats and / gives one
+    def is_int_valued(self, node):
+        if isinstance(node, NumberNode):
+            return type(node.value) is int
+        if not isinstance(node, OperationNode) or node.op.type == TT_DIV:
+            return False
+        known = self.int_valued.get(id(node))
+        if known is None:
+            known = self.is_int_valued(node.left) and (node.right is None or self.is_int_valued(node.right))
+            self.int_valued[id(node)] = known
+        return known
+
+
+# Only exact ints are identities: x * 1.0 would turn an int x into a float
+def is_int(node, value):
+    return isinstance(node, NumberNode) and type(node.value) is int and node.value == value
+
+
+def tree_size(node):
+    if isinstance(node, OperationNode):
+        return 1 + tree_size(node.left) + (tree_size(node.right) if node.right is not None else 0)
+    return 1
+
+
+def dag_size(node, seen=None):
+    if seen is None:
+        seen = set()
+    if id(node) in seen:
+        return 0
+    seen.add(id(node))
+    if isinstance(node, OperationNode):
+        return 1 + dag_size(node.left, seen) + (dag_size(node.right, seen) if node.right is not None else 0)
+    return 1
+
+
+# Returns the optimized DAG and how many nodes it eliminated
+def optimize(node):
+    optimized = Optimizer().optimize(node)
+    return optimized, tree_size(node) - dag_size(optimized)
+
+
 # main.py
-def run(text):
-    lexer = Lexer(text)
+# lines: a LineIndex for the lexer to fill in, to render errors with later
+def run(text, lines=None):
+    lexer = Lexer(text, lines)
     tokens, error = lexer.make_tokens()
     if error:
         return None, error
@@ -208,43 +476,112 @@ def run(text):
     return ast, ast.error
 
 
-def string_with_arrows(text, pos_start, pos_end):
-    result = ''
+# pos_start/pos_end are offsets into text; lines is the LineIndex the lexer
+# filled in (built here if not given, which scans the whole text once)
+def string_with_arrows(text, pos_start, pos_end, lines=None):
+    if lines is None:
+        lines = LineIndex.from_text(text)
+    ln_start, col_start = lines.line_col(pos_start)
+    # the line of the span's last character: a span over a '\n' ends on its line
+    ln_end, col_end = lines.line_col(max(pos_end - 1, pos_start))
+    col_end += 1
+
+    # Each line of the span, with carets under the span's part of it
+    result = []
+    for ln in range(ln_start, ln_end + 1):
+        line = text[lines.line_start(ln):lines.line_end(ln)]
+        start = col_start if ln == ln_start else 0
+        end = col_end if ln == ln_end else len(line)
+        result.append(line + '\n' + ' ' * start + '^' * max(end - start, 1))
+
+    return '\n'.join(result).replace('\t', '')
+
+
+# cache.py
+NUMBER_NODE, VARIABLE_NODE, OPERATION_NODE = range(3)
+OP_TOKENS = {op: Token(op, symbol) for op, symbol in
+             ((TT_PLUS, '+'), (TT_MINUS, '-'), (TT_MUL, '*'), (TT_DIV, '/'))}
+
+
+# Flattens a tree (or an optimized DAG, shared nodes written once) into
+# binarycache sections: a value pool, then one row per node in postorder,
+# children before parents: kind, value id (number, name or operator type)
+# and the row of each child, -1 for none. The root is the last row.
+def pack_tree(node):
+    kinds, args, lefts, rights = array('B'), array('q'), array('q'), array('q')
+    values, value_ids, rows = [], {}, {}
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if id(current) in rows:
+            continue
+        if isinstance(current, OperationNode) and not expanded:
+            stack.append((current, True))
+            if current.right is not None:
+                stack.append((current.right, False))
+            stack.append((current.left, False))
+            continue
+
+        if isinstance(current, NumberNode):
+            kind, value, left, right = NUMBER_NODE, current.value, -1, -1
+        elif isinstance(current, VariableNode):
+            kind, value, left, right = VARIABLE_NODE, current.name, -1, -1
+        else:
+            kind, value = OPERATION_NODE, current.op.type
+            left = rows[id(current.left)]
+            right = -1 if current.right is None else rows[id(current.right)]
+        key = (value.__class__, repr(value))  # keeps 0.0 and -0.0 apart
+        value_id = value_ids.get(key)
+        if value_id is None:
+            value_id = value_ids[key] = len(values)
+            values.append(value)
+        rows[id(current)] = len(kinds)
+        kinds.append(kind)
+        args.append(value_id)
+        lefts.append(left)
+        rights.append(right)
+    return binarycache.pack_values(values) + [kinds, args, lefts, rights]
+
+
+def unpack_tree(sections):
+    values = binarycache.unpack_values(*sections[:3])
+    nodes = []
+    for kind, arg, left, right in zip(*sections[3:]):
+        if kind == NUMBER_NODE:
+            nodes.append(NumberNode(values[arg]))
+        elif kind == VARIABLE_NODE:
+            nodes.append(VariableNode(values[arg]))
+        else:
+            nodes.append(OperationNode(nodes[left], OP_TOKENS[values[arg]], None if right < 0 else nodes[right]))
+    return nodes[-1]
 
-    # Calculate indices
-    idx_start = max(text.rfind('\n', 0, pos_start.idx), 0)
-    idx_end = text.find('\n', idx_start + 1)
-    if idx_end < 0:
-        idx_end = len(text)
 
-    # Generate each line
-    line_count = pos_end.ln - pos_start.ln + 1
-    for i in range(line_count):
-        # Calculate line columns
-        line = text[idx_start:idx_end]
-        col_start = pos_start.col if i == 0 else 0
-        col_end = pos_end.col if i == line_count - 1 else len(line) - 1
+TREE_SPEC = (Lexer, Parser, NumberNode, OperationNode, VariableNode, pack_tree, unpack_tree, DIGITS, LETTERS,
+             NUMBER_RUN, IDENTIFIER_RUN)
 
-        # Append to result
-        result += line + '\n'
-        result += ' ' * col_start + '^' * (col_end - col_start)
 
-        # Re-calculate indices
-        idx_start = idx_end
-        idx_end = text.find('\n', idx_start + 1)
-        if idx_end < 0:
-            idx_end = len(text)
+# run() through the on-disk cache: a source parsed before by the same lexer
+# and parser loads its tree from the cache file instead. Errors are not cached.
+def run_cached(text, cache):
+    spec = binarycache.spec_digest(*TREE_SPEC)
+    sections = cache.load("Seven.tree", text, spec)
+    if sections is not None:
+        return ParseResult().success(unpack_tree(sections)), None
 
-    return result.replace('\t', '')
+    ast, error = run(text)
+    if not error:
+        cache.store("Seven.tree", text, spec, pack_tree(ast.node))
+    return ast, error
 
 
 # Example usage
-text = input("Enter an expression: ")
-ast, error = run(text)
-
-if ast:
-    print(ast)
-else:
-    pos_start = ast.pos_start if error.pos_start is None else error.pos_start
-    pos_end = ast.pos_end if error.pos_end is None else error.pos_end
-    print(f'Error: {error}\n\n{string_with_arrows(text, pos_start, pos_end)}')
\ No newline at end of file
+if __name__ == "__main__":
+    text = input("Enter an expression: ")
+    lines = LineIndex()
+    ast, error = run(text, lines)
+
+    if not error:
+        print(ast.node)
+    else:
+        message, pos_start, pos_end = error.args
+        print(f'Error: {message}\n\n{string_with_arrows(text, pos_start, pos_end, lines)}')
\ No newline at end of file
@@ -1,6 +1,16 @@
+import operator
 import re
+import sys
+
+from precedence import OperatorTable, evaluate
+from symboltable import SymbolTable
+from tokenstream import TokenStream
+from tokentable import TokenTable
+from vectorized import VectorEvaluation
 
 class Token:
+    __slots__ = ("token_type", "value")
+
     def __init__(self, token_type, value):
         self.token_type = token_type
         self.value = value
@@ -9,6 +19,26 @@ class Token:
         return f"| {self.token_type:<18} | {self.value:<10} |"
 
 
+# Number and identifier runs are found with one match each and sliced from
+# the text, instead of built up a character at a time through advance()
+NUMBER_RUN = re.compile(r'[\d.]*')
+WORD_RUN = re.compile(r'\w*')
+SPACE_RUN = re.compile(r'\s*')
+
+# Tokens are never modified after lexing, so every occurrence of a
+# punctuation character or keyword shares one Token. These tables (and
+# HANDLERS below) are built once at import and never changed; plain dicts,
+# since a MappingProxyType lookup costs noticeably more per character.
+PUNCTUATION = {char: Token(token_type, char) for char, token_type in (
+    ("+", "+"), ("-", "-"), ("*", "*"), ("/", "/"), ("=", "ASSIGNMENT"), (";", "SEMICOLON"),
+    ("{", "LEFT_BRACE"), ("}", "RIGHT_BRACE"), ("(", "LEFT_PAREN"), (")", "RIGHT_PAREN"), (",", "COMMA"),
+)}
+KEYWORDS = {word: Token(token_type, word) for word, token_type in (
+    ("int", "TYPE"), ("float", "TYPE"), ("double", "TYPE"), ("char", "TYPE"), ("void", "TYPE"),
+    ("return", "RETURN"), ("if", "IF"), ("else", "ELSE"), ("while", "WHILE"), ("for", "FOR"),
+)}
+
+
 class Lexer:
     def __init__(self, input_text):
         self.input_text = input_text
@@ -22,49 +52,41 @@ class Lexer:
         else:
             self.current_char = None
 
-    def lex(self):
-        tokens = []
+    def skip_to(self, position):
+        self.position = position
+        self.current_char = self.input_text[position] if position < len(self.input_text) else None
+
+    def lex(self, tokens=None):
+        if tokens is None:
+            tokens = []
+        handlers = HANDLERS
+        append = tokens.append
         while self.current_char is not None:
-            if self.current_char.isspace():
-                self.advance()
-            elif self.current_char.isdigit():
-                tokens.append(self.parse_number())
-            elif self.current_char.isalpha():
-                tokens.append(self.parse_keyword())
-            elif self.current_char in "+-*/":
-                tokens.append(Token(self.current_char, self.current_char))
-                self.advance()
-            elif self.current_char == "=":
-                tokens.append(Token("ASSIGNMENT", "="))
-                self.advance()
-            elif self.current_char == ";":
-                tokens.append(Token("SEMICOLON", ";"))
-                self.advance()
-            elif self.current_char == "{":
-                tokens.append(Token("LEFT_BRACE", "{"))
-                self.advance()
-            elif self.current_char == "}":
-                tokens.append(Token("RIGHT_BRACE", "}"))
-                self.advance()
-            elif self.current_char == "(":
-                tokens.append(Token("LEFT_PAREN", "("))
-                self.advance()
-            elif self.current_char == ")":
-                tokens.append(Token("RIGHT_PAREN", ")"))
-                self.advance()
-            elif self.current_char == ",":
-                tokens.append(Token("COMMA", ","))
-                self.advance()
-            else:
-                raise Exception(f"Invalid character: {self.current_char}")
+            handler = handlers.get(self.current_char) or char_handler(self.current_char)
+            token = handler(self)
+            if token is not None:
+                append(token)
 
         return tokens
 
+    # a single space is one advance(); longer runs (indentation) one match
+    def skip_space(self):
+        self.advance()
+        if self.current_char is not None and self.current_char.isspace():
+            self.skip_to(SPACE_RUN.match(self.input_text, self.position).end())
+
+    def punctuation(self):
+        token = PUNCTUATION[self.current_char]
+        self.advance()
+        return token
+
+    def invalid(self):
+        raise Exception(f"Invalid character: {self.current_char}")
+
     def parse_number(self):
-        result = ""
-        while self.current_char is not None and (self.current_char.isdigit() or self.current_char == '.'):
-            result += self.current_char
-            self.advance()
+        end = NUMBER_RUN.match(self.input_text, self.position).end()
+        result = self.input_text[self.position:end]
+        self.skip_to(end)
 
         if '.' in result:
             return Token("NUMBER", float(result))
@@ -72,32 +94,42 @@ class Lexer:
             return Token("NUMBER", int(result))
 
     def parse_keyword(self):
-        result = ""
-        while self.current_char is not None and (self.current_char.isalnum() or self.current_char == '_'):
-            result += self.current_char
-            self.advance()
-
-        if result in ["int", "float", "double", "char", "void"]:
-            return Token("TYPE", result)
-        elif result == "return":
-            return Token("RETURN", result)
-        elif result == "if":
-            return Token("IF", result)
-        elif result == "else":
-            return Token("ELSE", result)
-        elif result == "while":
-            return Token("WHILE", result)
-        elif result == "for":
-            return Token("FOR", result)
-        else:
-            return Token("IDENTIFIER", result)
+        end = WORD_RUN.match(self.input_text, self.position).end()
+        result = self.input_text[self.position:end]
+        self.skip_to(end)
+
+        token = KEYWORDS.get(result)
+        if token is None:
+            # interned: every occurrence of a name shares one string
+            token = Token("IDENTIFIER", sys.intern(result))
+        return token
+
+
+# The Lexer method that lexes a token starting with char
+def char_handler(char):
+    if char in PUNCTUATION:
+        return Lexer.punctuation
+    elif char.isspace():
+        return Lexer.skip_space
+    elif char.isdigit():
+        return Lexer.parse_number
+    elif char.isalpha():
+        return Lexer.parse_keyword
+    else:
+        return Lexer.invalid
+
+
+# Precomputed for ASCII; other characters go through char_handler(). A
+# plain space, the most common character, skips straight to advance().
+HANDLERS = {chr(code): char_handler(chr(code)) for code in range(128)}
+HANDLERS[" "] = Lexer.advance
 
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.current_token = self.tokens.pop(0) if tokens else None
-        self.variables = {}
+        self.tokens = TokenStream(tokens)
+        self.current_token = self.tokens.advance()
+        self.variables = SymbolTable()
 
     def error(self):
         print("Invalid syntax")
@@ -105,7 +137,7 @@ class Parser:
 
     def eat(self, token_type):
         if self.current_token.token_type == token_type:
-            self.current_token = self.tokens.pop(0) if self.tokens else None
+            self.current_token = self.tokens.advance()
         else:
             self.error()
 
@@ -117,6 +149,7 @@ class Parser:
         elif self.current_token.token_type == "IDENTIFIER":
             result = self.current_token.value
             self.eat("IDENTIFIER")
+            self.variables.resolve(result)  # raises for undeclared names
             return result
         elif self.current_token.token_type == "LEFT_PAREN":
             self.eat("LEFT_PAREN")
@@ -165,9 +198,13 @@ class Parser:
     def block(self):
         if self.current_token.token_type == "LEFT_BRACE":
             self.eat("LEFT_BRACE")
-            while self.current_token and self.current_token.token_type != "RIGHT_BRACE":
-                result = self.statement()  # Capture the return value of statement
-                # Handle the return value if needed
+            self.variables.enter_scope()
+            try:
+                while self.current_token and self.current_token.token_type != "RIGHT_BRACE":
+                    result = self.statement()  # Capture the return value of statement
+                    # Handle the return value if needed
+            finally:
+                self.variables.exit_scope()
             self.eat("RIGHT_BRACE")
         else:
             self.error()
@@ -176,30 +213,38 @@ class Parser:
         self.eat("TYPE")  # Return type
         func_name = self.current_token.value
         self.eat("IDENTIFIER")
+        self.variables.declare(func_name)  # visible in its own body, for recursion
         self.eat("LEFT_PAREN")
 
-        while self.current_token and self.current_token.token_type != "RIGHT_PAREN":
-            self.parameter()
+        # parameters and body share one scope
+        self.variables.enter_scope()
+        try:
+            while self.current_token and self.current_token.token_type != "RIGHT_PAREN":
+                self.parameter()
 
-            if self.current_token and self.current_token.token_type == "COMMA":
-                self.eat("COMMA")
-        self.eat("RIGHT_PAREN")
+                if self.current_token and self.current_token.token_type == "COMMA":
+                    self.eat("COMMA")
+            self.eat("RIGHT_PAREN")
 
-        if self.current_token and self.current_token.token_type == "LEFT_BRACE":
-            self.eat("LEFT_BRACE")
-            while self.current_token and self.current_token.token_type != "RIGHT_BRACE":
-                self.statement()
-            self.eat("RIGHT_BRACE")
-        else:
-            self.eat("SEMICOLON")
+            if self.current_token and self.current_token.token_type == "LEFT_BRACE":
+                self.eat("LEFT_BRACE")
+                while self.current_token and self.current_token.token_type != "RIGHT_BRACE":
+                    self.statement()
+                self.eat("RIGHT_BRACE")
+            else:
+                self.eat("SEMICOLON")
+        finally:
+            self.variables.exit_scope()
 
     def parameter(self):
         self.eat("TYPE")
+        self.variables.declare(self.current_token.value)
         self.eat("IDENTIFIER")
 
         while self.current_token and self.current_token.token_type == "COMMA":
             self.eat("COMMA")
             self.eat("TYPE")
+            self.variables.declare(self.current_token.value)
             self.eat("IDENTIFIER")
 
     def statement(self):
@@ -214,6 +259,76 @@ class Parser:
             self.variable_declaration()
 
 
+def divide(left, right):
+    if right != 0:
+        return left / right
+    raise Exception("Division by zero")
+
+
+# As in Parser.factor(): the name is checked, but the name itself is the value
+def resolved_name(parser, name):
+    parser.variables.resolve(name)  # raises for undeclared names
+    return name
+
+
+# Covers "*" and "/" too: the lexer emits those, which term() never matches
+OPERATORS = OperatorTable(
+    binary={
+        "+": (1, False, operator.add),
+        "-": (1, False, operator.sub),
+        "*": (2, False, operator.mul),
+        "/": (2, False, divide),
+    },
+    prefix={},
+    operands=("NUMBER", "IDENTIFIER"),
+    lparen="LEFT_PAREN",
+    rparen="RIGHT_PAREN",
+    resolve={"IDENTIFIER": resolved_name},
+)
+
+
+# Parser with expr() evaluated without recursion (see precedence.py)
+class PrecedenceParser(Parser):
+    def expr(self):
+        return evaluate(self, OPERATORS)
+
+
+# Evaluates expr() over NumPy arrays: VectorParser(tokens, {"x": xs}).evaluate()
+class VectorParser(VectorEvaluation, Parser):
+    def factor(self):
+        if self.current_token.token_type == "IDENTIFIER":
+            name = self.current_token.value
+            self.eat("IDENTIFIER")
+            return self.lookup(name)
+        return super().factor()
+
+    def term(self):
+        result = self.factor()
+
+        while self.current_token and self.current_token.token_type in ("*", "/"):
+            operator = self.current_token.token_type
+            self.eat(operator)
+            if operator == "*":
+                result = self.np.multiply(result, self.factor())
+            else:
+                result = self.divide(result, self.factor())
+
+        return result
+
+    def expr(self):
+        result = self.term()
+
+        while self.current_token and self.current_token.token_type in ("+", "-"):
+            operator = self.current_token.token_type
+            self.eat(operator)
+            if operator == "+":
+                result = self.np.add(result, self.term())
+            else:
+                result = self.np.subtract(result, self.term())
+
+        return result
+
+
 def main():
     input_program = """
     int add(int a, int b) {
@@ -233,12 +348,9 @@ def main():
 
     # Display Token Table
     print("\nToken Table:")
-    print("| Type              | Value      |")
-    print("|-------------------|------------|")
-    for token in tokens:
-        print(token)
+    TokenTable(tokens).write(sys.stdout)
 
-    parser = Parser(tokens.copy())
+    parser = PrecedenceParser(tokens)
     parser.block()  # Start parsing from the block
     print("\nParsing completed successfully.")
 
@@ -1,12 +1,15 @@
 import re
+import sys
+
+from tokentable import TokenTable
 
 # Token types
 TOKEN_TYPES = {
     "KEYWORD": {"int", "float", "if", "else", "while", "for", "switch", "return"},
     "IDENTIFIER": r'[a-zA-Z_]\w*',
     "OPERATOR": r'[-+*/()]',
+    "FLOAT": r'\d+\.\d+',  # before INTEGER so "1.5" is not split
     "INTEGER": r'\d+',
-    "FLOAT": r'\d+\.\d+',
     "WHITESPACE": r'\s+',
 }
 
@@ -20,19 +23,23 @@ class Token:
         return f"Token({self.type}, {self.value})"
 
 
-# Lexer function
+# Master pattern: one named group per token type, tried in TOKEN_TYPES order.
+# Keywords are matched as IDENTIFIER and reclassified with a set lookup.
+KEYWORDS = TOKEN_TYPES["KEYWORD"]
+TOKEN_REGEX = re.compile('|'.join(
+    f'(?P<{type}>{pattern})' for type, pattern in TOKEN_TYPES.items() if not isinstance(pattern, set)
+))
+
+
+# Lexer function (single pass, tokens come back in source order)
 def lexer(program):
     tokens = []
-    for type, pattern in TOKEN_TYPES.items():
-        if isinstance(pattern, set):
-            values = pattern
-            regex = re.compile(fr'\b(?:{"|".join(re.escape(v) for v in values)})\b')
-        else:
-            regex = re.compile(pattern)
-        matches = regex.finditer(program)
-        for match in matches:
-            value = match.group(0)
-            tokens.append(Token(type, value))
+    for match in TOKEN_REGEX.finditer(program):
+        type = match.lastgroup
+        value = match.group()
+        if type == 'IDENTIFIER' and value in KEYWORDS:
+            type = 'KEYWORD'
+        tokens.append(Token(type, value))
     return tokens
 
 
@@ -112,11 +119,10 @@ if __name__ == "__main__":
 
     # Display token table (excluding whitespaces)
     print("\nToken Table:")
-    print("| Type       | Value      |")
-    print("|------------|------------|")
-    for token in tokens:
-        if token.type != 'WHITESPACE':
-            print(f"| {token.type:<10} | {token.value:<10} |")
+    TokenTable(
+        tokens, header="| Type       | Value      |\n|------------|------------|",
+        row=lambda token: f"| {token.type:<10} | {token.value:<10} |", skip={'WHITESPACE'},
+    ).write(sys.stdout)
 
     # Count and display the number of whitespaces
     num_whitespaces = sum(1 for token in tokens if token.type == 'WHITESPACE')
@@ -0,0 +1,66 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundCompiler:
+    # Runs compile jobs on a worker thread so Tk's mainloop never blocks on
+    # them. Finished jobs come back through a queue that the Tk thread polls
+    # with after(), so callbacks always run on the Tk thread. submit() and
+    # supersede() drop the previous job: a queued one is cancelled, a running
+    # one has its result dropped.
+    #
+    # The poll loop doubles as a frame clock: max_stall is the worst delay of
+    # a tick since the last submit(), i.e. how long the UI went unserviced.
+    def __init__(self, master, poll_ms=15):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.results = queue.Queue()
+        self.job_id = 0
+        self.future = None
+        self.latency = None
+        self.max_stall = 0.0
+        self.last_tick = time.perf_counter()
+        self.master.after(self.poll_ms, self.poll)
+
+    # For callers that answer without a job (e.g. from a cache), so a job
+    # still in flight cannot overwrite that answer when it finishes
+    def supersede(self):
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        self.job_id += 1
+
+    def submit(self, func, args, on_done, on_error):
+        self.supersede()
+        job = (self.job_id, time.perf_counter(), on_done, on_error)
+        self.max_stall = 0.0
+        self.future = self.executor.submit(func, *args)
+        self.future.add_done_callback(lambda future: self.results.put((job, future)))
+
+    def poll(self):
+        now = time.perf_counter()
+        self.max_stall = max(self.max_stall, now - self.last_tick - self.poll_ms / 1000)
+        self.last_tick = now
+
+        while True:
+            try:
+                (job_id, started, on_done, on_error), future = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if job_id != self.job_id or future.cancelled():
+                continue
+            self.latency = now - started
+            error = future.exception()
+            if error is None:
+                on_done(future.result())
+            else:
+                on_error(error)
+
+        self.master.after(self.poll_ms, self.poll)
+
+    def __str__(self):
+        if self.latency is None:
+            return "Last compile: -"
+        return f"Last compile: {self.latency * 1000:.1f} ms, max UI stall: {self.max_stall * 1000:.1f} ms"
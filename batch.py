@@ -0,0 +1,146 @@
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import Eight
+import test
+from binarycache import BinaryCache
+from profiling import NULL_PROFILER, Profiler
+from tokentable import EXTENSIONS, FORMATS, TokenTable
+
+IDENTIFIER_HEADER = "| Identifier        | Value      |\n|-------------------|------------|\n"
+
+
+# test.py pipeline: declarations, executed while parsing. Sections are stored
+# in outputs as they complete, so a parse error still leaves the token table.
+def compile_declarations(text, outputs, profiler=NULL_PROFILER, cache=None):
+    with profiler.stage("lex") as stage:
+        tokens = test.Lexer(text).lex() if cache is None else test.lex_cached(text, cache)
+        stage.count, stage.unit = len(tokens), "tokens"
+    with profiler.stage("token table"):
+        outputs["tokens"] = TokenTable(tokens)
+    with profiler.stage("parse") as stage:
+        parser = test.Parser(tokens)
+        while parser.current_token:
+            parser.statement()
+        stage.count, stage.unit = len(parser.variables), "names"
+    with profiler.stage("identifier table"):
+        outputs["identifiers"] = IDENTIFIER_HEADER + "".join(
+            f"| {identifier:<18} | {str(value):<10} |\n" for identifier, value in parser.variables.items()
+        )
+    return len(tokens)
+
+
+# Eight.py pipeline: one arithmetic expression
+def compile_expression(text, outputs, profiler=NULL_PROFILER, cache=None):
+    with profiler.stage("lex") as stage:
+        tokens = Eight.Lexer(text).lex() if cache is None else Eight.lex_cached(text, cache)
+        stage.count, stage.unit = len(tokens), "tokens"
+    with profiler.stage("token table"):
+        # Eight's own row format, also for cached tokens
+        outputs["tokens"] = TokenTable(tokens, row=Eight.Token.__str__)
+    with profiler.stage("parse"):
+        outputs["result"] = f"Output: {Eight.Parser(tokens).expr()}\n"
+    return len(tokens)
+
+
+PIPELINES = {"test": compile_declarations, "eight": compile_expression}
+
+
+def compile_file(job):
+    pipeline, path, out_base, profile, table_format, cache_dir = job
+    outputs = {}
+    profiler = Profiler(trace_memory=profile == "memory") if profile else NULL_PROFILER
+    cache = BinaryCache(cache_dir) if cache_dir else None
+    try:
+        with open(path) as source:
+            token_count = PIPELINES[pipeline](source.read(), outputs, profiler, cache)
+        error = ""
+    except (Exception, SystemExit) as e:  # Eight.Parser.error() calls exit()
+        token_count = 0
+        error = f"{type(e).__name__}: {e}\n"
+    outputs["errors"] = error or "No errors.\n"
+    if profiler.enabled:
+        outputs["profile"] = profiler.to_json() + "\n"
+
+    os.makedirs(os.path.dirname(out_base), exist_ok=True)
+    for section, text in outputs.items():
+        if isinstance(text, TokenTable):
+            with open(f"{out_base}.{section}.{EXTENSIONS[table_format]}", "w", newline="") as output:
+                text.write(output, table_format)
+        else:
+            with open(f"{out_base}.{section}.txt", "w") as output:
+                output.write(text)
+    return token_count, not error
+
+
+def collect_files(paths, pattern):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if fnmatch.fnmatch(name, pattern))
+        else:
+            files.append(path)
+    return files
+
+
+def run_batch(jobs, workers, chunksize):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(compile_file, jobs, chunksize=chunksize))
+    return time.perf_counter() - start, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lex and parse many source files in parallel.")
+    parser.add_argument("paths", nargs="+", help="files or directories to compile")
+    parser.add_argument("-o", "--output", default="batch_output", help="directory for the per-file tables")
+    parser.add_argument("-p", "--pipeline", choices=sorted(PIPELINES), default="test")
+    parser.add_argument("-g", "--glob", default="*.c", help="file name pattern inside directories")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("-c", "--chunksize", type=int, default=0, help="files per task (0: auto)")
+    parser.add_argument("--scaling", action="store_true", help="time 1, 2, 4, ... up to --jobs workers")
+    parser.add_argument("-t", "--table-format", choices=FORMATS, default="table", help="token table format")
+    parser.add_argument("--profile", choices=("time", "memory"), help="write <file>.profile.txt stage reports")
+    parser.add_argument("--cache", metavar="DIR", help="reuse token streams cached in DIR across runs")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths, args.glob)
+    if not files:
+        parser.error("no input files")
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+    jobs = [
+        (args.pipeline, path, os.path.join(args.output, os.path.relpath(os.path.abspath(path), root)), args.profile,
+         args.table_format, args.cache)
+        for path in files
+    ]
+
+    counts = [args.jobs]
+    if args.scaling:
+        counts = [1]
+        while counts[-1] * 2 <= args.jobs:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != args.jobs:
+            counts.append(args.jobs)
+
+    print(f"Files: {len(files)}")
+    print("| Workers | Seconds    | Files/sec  | Speedup    |")
+    print("|---------|------------|------------|------------|")
+    baseline = None
+    for workers in counts:
+        chunksize = args.chunksize or max(1, len(jobs) // (workers * 8))
+        seconds, results = run_batch(jobs, workers, chunksize)
+        baseline = baseline or seconds
+        print(f"| {workers:<7} | {seconds:<10.3f} | {len(files) / seconds:<10.1f} | {baseline / seconds:<10.2f} |")
+
+    failed = sum(1 for _, ok in results if not ok)
+    print(f"\nTokens: {sum(count for count, _ in results)}, files with errors: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import time
+
+import guipart
+import sixgui
+from backgroundcompile import BackgroundCompiler
+from compilecache import CompileCache
+
+REPEAT = 5
+SLOW_TERMS = 20_000  # operands in the program still compiling when the edit arrives
+
+
+# Stands in for the Tk root: after() callbacks are queued and run by tick(),
+# so the poll loop can be driven without a display
+class Clock:
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, func):
+        self.callbacks.append(func)
+
+    def tick(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for func in callbacks:
+            func()
+
+
+class Text:
+    def __init__(self, text=""):
+        self.text = text
+
+    def get(self, *args):
+        return self.text
+
+    def config(self, text):
+        self.text = text
+
+
+# The GUIs' compile and display methods, without their widgets: what would
+# be shown is kept in self.shown
+class Session:
+    def __init__(self):
+        self.clock = Clock()
+        self.cache = CompileCache()
+        self.compiler = BackgroundCompiler(self.clock)
+        self.status_label = Text()
+        self.shown = None
+
+    def show_compiled(self, compiled):
+        self.shown = compiled
+
+    def show_error(self, error):
+        raise error
+
+    def show_profile(self, text):
+        pass
+
+    # The result (guipart) or identifier table (sixgui) on screen
+    def result(self):
+        return self.shown[2]
+
+    # Edit to text, compile it, and run the poll loop once its job is done
+    def edit(self, text):
+        self.entry.text = text
+        self.compile()
+        future = self.compiler.future
+        while future is not None and not future.done():
+            time.sleep(0.001)
+        self.clock.tick()
+
+
+class ExpressionSession(Session):
+    compile = guipart.MathCompilerGUI.compile_expression
+    finish_compile = guipart.MathCompilerGUI.finish_compile
+
+    def __init__(self):
+        super().__init__()
+        self.expression_entry = self.entry = Text()
+
+
+class ProgramSession(Session):
+    compile = sixgui.MathCompilerGUI.compile_program
+    finish_compile = sixgui.MathCompilerGUI.finish_compile
+
+    def __init__(self):
+        super().__init__()
+        self.program_entry = self.entry = Text()
+        self.lexer = sixgui.IncrementalLexer()
+        self.profile_enabled = self.trace_memory = Text(False)
+
+
+# Edits A -> B while A is still compiling, with B already in the cache: B's
+# cached result must stay on screen when A's job finishes
+def superseded_edit(session, slow, cached):
+    session.edit(cached)
+    expected = session.result()
+
+    session.entry.text = slow
+    session.compile()
+    pending = session.compiler.future
+    session.entry.text = cached
+    start = time.perf_counter()
+    session.compile()  # served from the cache
+    hit_seconds = time.perf_counter() - start
+    if session.result() != expected:
+        raise Exception("Cache hit was not shown")
+
+    while not pending.done():
+        time.sleep(0.001)
+    session.clock.tick()
+    if session.result() != expected:
+        raise Exception("A superseded job overwrote the cached result")
+    return hit_seconds
+
+
+def main():
+    cases = (
+        ("guipart expression", ExpressionSession,
+         " + ".join(str(i % 97) for i in range(SLOW_TERMS)), "1 + 2 * 3"),
+        ("sixgui program", ProgramSession,
+         "".join(f"int v{i} = {i} * 2;\n" for i in range(SLOW_TERMS)), "int x = 1 + 2 * 3;\n"),
+    )
+    print("| Case                | Cache hit ms |")
+    print("|---------------------|--------------|")
+    for label, session_type, slow, cached in cases:
+        best = min(superseded_edit(session_type(), slow, cached) for _ in range(REPEAT))
+        print(f"| {label:<19} | {best * 1000:<12.3f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import Eight
+import Seven
+import test
+from bench_suite import arithmetic, declarations
+from binarycache import BinaryCache, spec_digest
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 5
+PROCESS_RUNS = 5
+PROCESS_SIZE = 10_000
+
+sys.setrecursionlimit(50_000)  # Seven's repr/interpret recurse down long operator chains
+
+
+def best_of(func, repeat=REPEAT):
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+    finally:
+        gc.enable()
+    return best, result
+
+
+# (label, source generator, cache name, spec, produce, store, load, compare key)
+def cases():
+    test_spec = spec_digest(test)
+    eight_spec = spec_digest(Eight)
+    tree_spec = spec_digest(*Seven.TREE_SPEC)
+
+    def token_key(tokens):
+        return [(token.token_type, token.value) for token in tokens]
+
+    return (
+        ("test.py tokens", declarations, "test.tokens", test_spec,
+         lambda source: test.Lexer(source).lex(), BinaryCache.store_tokens, BinaryCache.load_tokens, token_key),
+        ("Eight.py tokens", arithmetic, "Eight.tokens", eight_spec,
+         lambda source: Eight.Lexer(source).lex(), BinaryCache.store_tokens, BinaryCache.load_tokens, token_key),
+        ("Seven.py tree", arithmetic, "Seven.tree", tree_spec,
+         lambda source: Seven.run(source)[0].node,
+         lambda cache, name, source, spec, node: cache.store(name, source, spec, Seven.pack_tree(node)),
+         lambda cache, name, source, spec: Seven.unpack_tree(cache.load(name, source, spec)),
+         lambda node: [section.tobytes() for section in Seven.pack_tree(node)]),
+    )
+
+
+def in_process(directory):
+    print("In process (best of %d):" % REPEAT)
+    print("| Case             | Size     | Lex/parse ms | Cold ms      | Warm ms      | Speedup  | File KB    |")
+    print("|------------------|----------|--------------|--------------|--------------|----------|------------|")
+    for label, generate, name, spec, produce, store, load, key in cases():
+        for size in SIZES:
+            source = generate(size)
+            cache = BinaryCache(os.path.join(directory, f"{name}-{size}"))
+            parse_seconds, result = best_of(lambda: produce(source))
+
+            # cold: nothing cached yet, so produce and store
+            def cold():
+                for entry in os.listdir(cache.directory) if os.path.isdir(cache.directory) else ():
+                    os.remove(os.path.join(cache.directory, entry))
+                value = produce(source)
+                store(cache, name, source, spec, value)
+                return value
+            cold_seconds, _ = best_of(cold)
+            warm_seconds, loaded = best_of(lambda: load(cache, name, source, spec))
+
+            if key(loaded) != key(result):
+                raise Exception(f"{label} {size}: cached result differs from a fresh run")
+            kilobytes = os.path.getsize(cache.path(name, source)) / 1024
+            print(f"| {label:<16} | {size:<8} | {parse_seconds * 1000:<12.3f} | {cold_seconds * 1000:<12.3f} |"
+                  f" {warm_seconds * 1000:<12.3f} | {parse_seconds / warm_seconds:<7.1f}x | {kilobytes:<10.1f} |")
+
+
+# One fresh interpreter per run: startup, imports, then test.lex_cached() and
+# a full parse of the declarations
+def run_process(path, cache_dir):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, __file__, "--run", path, cache_dir], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def fresh_processes(directory):
+    path = os.path.join(directory, "program.c")
+    with open(path, "w") as output:
+        output.write(declarations(PROCESS_SIZE))
+    cold, warm = [], []
+    for i in range(PROCESS_RUNS):
+        cold.append(run_process(path, os.path.join(directory, f"cold-{i}")))
+    for _ in range(PROCESS_RUNS):
+        warm.append(run_process(path, os.path.join(directory, "cold-0")))
+    print(f"\nFresh process, test.py, {PROCESS_SIZE} declarations (best of {PROCESS_RUNS}):")
+    print(f"Cold start (empty cache): {min(cold) * 1000:.1f} ms")
+    print(f"Warm start (cached):      {min(warm) * 1000:.1f} ms")
+
+
+def run(path, cache_dir):
+    with open(path) as source:
+        tokens = test.lex_cached(source.read(), BinaryCache(cache_dir))
+    parser = test.Parser(tokens)
+    while parser.current_token:
+        parser.statement()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        in_process(directory)
+        fresh_processes(directory)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main()
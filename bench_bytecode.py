@@ -0,0 +1,70 @@
+import gc
+import sys
+import time
+
+import bytecode
+import test
+from bench_suite import declarations
+
+SIZES = (100, 1_000, 10_000)
+MIN_STATEMENTS_TIMED = 100_000
+WIDE = 70_000  # more constants and slots than a two-byte argument holds
+
+
+def best_time(func, repeat):
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best, result
+
+
+def interpret(tokens):
+    parser = test.Parser(tokens)
+    while parser.current_token:
+        parser.statement()
+    return parser.variables
+
+
+# Every declaration has its own constant and slot, so past 65,535 of either
+# the arguments need EXTENDED_ARG prefixes
+def wide_declarations(size):
+    return "int v0 = 0;\n" + "".join(f"int v{i} = {i} * 2 + v{i // 2};\n" for i in range(1, size))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print("| Statements | Lex+parse ms | Parse ms   | Compile ms | VM run ms  | Code bytes | VM vs parse |")
+    print("|------------|--------------|------------|------------|------------|------------|-------------|")
+    for size in sizes:
+        source = declarations(size)
+        repeat = max(3, MIN_STATEMENTS_TIMED // size)
+        tokens = test.Lexer(source).lex()
+
+        full, _ = best_time(lambda: interpret(test.Lexer(source).lex()), repeat)
+        parse, expected = best_time(lambda: interpret(tokens), repeat)
+        compile_time, program = best_time(lambda: test.CompilingParser(tokens).compile(), repeat)
+        run, variables = best_time(lambda: bytecode.run(program), repeat)
+        if variables != expected:
+            raise Exception(f"VM result differs from the interpreter for {size} statements")
+
+        print(f"| {size:<10} | {full * 1000:<12.3f} | {parse * 1000:<10.3f} | {compile_time * 1000:<10.3f} | "
+              f"{run * 1000:<10.3f} | {len(program):<10} | {parse / run:<10.1f}x |")
+
+    tokens = test.Lexer(wide_declarations(WIDE)).lex()
+    program = test.CompilingParser(tokens).compile()
+    run, variables = best_time(lambda: bytecode.run(program), 3)
+    if variables != interpret(tokens):
+        raise Exception(f"VM result differs from the interpreter for {WIDE} wide declarations")
+    print(f"\nWide arguments: {len(program.constants)} constants, {len(program.names)} slots,"
+          f" VM run {run * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import gc
+import sys
+import time
+
+import Seven
+
+EXPRESSION = "(x + 2) * -y - x / 4 + 3 * (y - 1) / (x + 0.5)"
+COUNT = 1_000_000
+
+
+def bench(name, evaluate, inputs):
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for x, y in inputs:
+            evaluate(x, y)
+        seconds = time.perf_counter() - start
+    finally:
+        gc.enable()
+    print(f"| {name:<20} | {seconds:<10.3f} | {seconds / len(inputs) * 1e9:<10.1f} |")
+    return seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    inputs = [(i % 97 + 0.25, i % 89 - 44) for i in range(count)]
+
+    # compile_expression() also optimizes, so each evaluator runs on both
+    # trees and the two effects are reported separately
+    node = Seven.run(EXPRESSION)[0].node
+    optimized = Seven.optimize(node)[0]
+    compiled = Seven.compile_node(node, ("x", "y"))
+    compiled_optimized = Seven.compile_expression(EXPRESSION)
+    if compiled_optimized.variables != ("x", "y"):
+        raise Exception(f"Unexpected parameters: {compiled_optimized.variables}")
+
+    print(f"Expression: {EXPRESSION}")
+    print(f"Evaluations: {count}")
+    print("| Evaluator            | Seconds    | ns/eval    |")
+    print("|----------------------|------------|------------|")
+    walk = bench("tree walk", lambda x, y: Seven.interpret(node, {"x": x, "y": y}), inputs)
+    walk_optimized = bench("tree walk, optimized", lambda x, y: Seven.interpret(optimized, {"x": x, "y": y}), inputs)
+    fast = bench("compiled", compiled, inputs)
+    fast_optimized = bench("compiled, optimized", compiled_optimized, inputs)
+    print(f"\nCompilation: {walk / fast:.1f}x unoptimized, {walk_optimized / fast_optimized:.1f}x optimized")
+    print(f"Optimizer:   {walk / walk_optimized:.2f}x tree walk, {fast / fast_optimized:.2f}x compiled")
+    print(f"Both:        {walk / fast_optimized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import random
+import sys
+import time
+
+import sixgui
+
+LINES = (1_000, 10_000)
+EDITS = 200
+
+
+def generate_program(lines):
+    return "".join(f"int v{i} = v{i // 2} * {i % 97} + {i % 13};\n" for i in range(lines))
+
+
+# Scripted session: type a statement one character at a time at a random
+# line start, then backspace over part of it
+def edit_script(text, count, seed=7):
+    rng = random.Random(seed)
+    edits = []
+    while len(edits) < count:
+        line_starts = [0] + [i + 1 for i, char in enumerate(text) if char == "\n"][:-1]
+        position = rng.choice(line_starts)
+        for char in "int tmp = 42;\n":
+            text = text[:position] + char + text[position:]
+            edits.append(text)
+            position += 1
+        for _ in range(5):
+            position -= 1
+            text = text[:position] + text[position + 1:]
+            edits.append(text)
+    return edits[:count]
+
+
+def replay_full(edits):
+    start = time.perf_counter()
+    for text in edits:
+        sixgui.Lexer(text).lex()
+    return time.perf_counter() - start
+
+
+def replay_incremental(initial, edits):
+    lexer = sixgui.IncrementalLexer(initial)
+    relexed = 0
+    start = time.perf_counter()
+    for text in edits:
+        lexer.update(text)
+        relexed += lexer.relexed
+    seconds = time.perf_counter() - start
+    assert [(t.token_type, t.value) for t in lexer.lex()[0]] == \
+        [(t.token_type, t.value) for t in sixgui.Lexer(edits[-1]).lex()[0]]
+    return seconds, relexed / len(edits)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or LINES
+    print("| Lines   | Chars      | Full us/edit | Incremental us/edit | Tokens re-lexed/edit |")
+    print("|---------|------------|--------------|---------------------|----------------------|")
+    for lines in sizes:
+        initial = generate_program(lines)
+        edits = edit_script(initial, EDITS)
+        full = replay_full(edits)
+        incremental, relexed = replay_incremental(initial, edits)
+        print(f"| {lines:<7} | {len(initial):<10} | {full / len(edits) * 1e6:<12.0f} | "
+              f"{incremental / len(edits) * 1e6:<19.1f} | {relexed:<20.1f} |")
+
+
+if __name__ == "__main__":
+    main()
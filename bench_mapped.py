@@ -0,0 +1,71 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import test
+
+LINES = 200_000
+
+
+def write_program(path, lines):
+    with open(path, "w") as output:
+        for i in range(lines):
+            output.write(f"int var{i % 500} = {i % 1000} + var{(i + 1) % 500} * 2.5;\n")
+
+
+# Runs in a child process so each mode gets its own peak RSS
+def run(mode, path):
+    start = time.perf_counter()
+    if mode == "str":
+        with open(path) as source:
+            tokens = test.Lexer(source.read()).lex()
+    else:
+        tokens = test.lex_file(path)
+    seconds = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(len(tokens), seconds, peak_kb)
+
+
+def measure(mode, path):
+    output = subprocess.run(
+        [sys.executable, __file__, "--run", mode, path],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return int(output[0]), float(output[1]), int(output[2])
+
+
+# A malformed number fails during lexing on both paths, with the same error
+def check_errors():
+    errors = []
+    for lex in (lambda source: test.Lexer(source).lex(), lambda source: test.lex_buffer(source.encode())):
+        try:
+            lex("int x = 1.2.3;")
+        except ValueError as e:
+            errors.append(str(e))
+    if len(errors) != 2 or errors[0] != errors[1]:
+        raise Exception(f"Lexers disagree on a malformed number: {errors}")
+
+
+def main():
+    check_errors()
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else LINES
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.c")
+        write_program(path, lines)
+        size = os.path.getsize(path)
+        print(f"Source: {lines} lines, {size / 1024 / 1024:.1f} MB")
+        print("| Lexer                | Tokens     | Seconds    | Peak RSS MB |")
+        print("|----------------------|------------|------------|-------------|")
+        for label, mode in (("str + list of Token", "str"), ("mmap + TokenBuffer", "mmap")):
+            count, seconds, peak_kb = measure(mode, path)
+            print(f"| {label:<20} | {count:<10} | {seconds:<10.3f} | {peak_kb / 1024:<11.1f} |")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main()
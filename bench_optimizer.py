@@ -0,0 +1,71 @@
+import gc
+import random
+import sys
+import time
+
+import Seven
+
+COUNT = 100_000
+
+
+# Random expression over x, y, z that keeps reusing earlier subexpressions
+# and constant-only subtrees, the shape generated code tends to have.
+def generate(depth, rng, pool):
+    if depth == 0:
+        return rng.choice(["x", "y", "z", "0", "1", "2", "3.5"])
+    if pool and rng.random() < 0.3:
+        return rng.choice(pool)
+    if rng.random() < 0.2:
+        return f"({rng.randint(1, 9)} * {rng.randint(1, 9)} + 1)"
+    op = rng.choice(["+", "-", "*"])
+    if rng.random() < 0.15:
+        expr = f"({generate(depth - 1, rng, pool)} / {rng.choice(['2', '4', '1'])})"
+    else:
+        expr = f"({generate(depth - 1, rng, pool)} {op} {generate(depth - 1, rng, pool)})"
+    pool.append(expr)
+    return expr
+
+
+def bench(func, inputs):
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for x, y, z in inputs:
+            func(x, y, z)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    rng = random.Random(42)
+    inputs = [(i % 7 + 0.5, i % 5 - 2.0, i % 3 + 1.0) for i in range(count)]
+
+    print(f"Evaluations per expression: {count}")
+    print("| Depth | Nodes  | Eliminated | Walk (s)   | Walk opt (s) | Compiled (s) | Compiled opt (s) |")
+    print("|-------|--------|------------|------------|--------------|--------------|------------------|")
+    for depth in (4, 6, 8):
+        text = generate(depth, rng, [])
+        node = Seven.run(text)[0].node
+        optimized, eliminated = Seven.optimize(node)
+
+        def walk(tree):
+            return lambda x, y, z: Seven.interpret(tree, {"x": x, "y": y, "z": z})
+
+        def compiled(tree):
+            return Seven.compile_node(tree, ("x", "y", "z"))
+
+        walk_count = count // 10  # the tree walk is slow, scale it back up below
+        times = [
+            bench(walk(node), inputs[:walk_count]) * 10,
+            bench(walk(optimized), inputs[:walk_count]) * 10,
+            bench(compiled(node), inputs),
+            bench(compiled(optimized), inputs),
+        ]
+        print(f"| {depth:<5} | {Seven.tree_size(node):<6} | {eliminated:<10} | {times[0]:<10.3f} | "
+              f"{times[1]:<12.3f} | {times[2]:<12.3f} | {times[3]:<16.3f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import gc
+import sys
+import time
+
+import Eight
+import test
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+LEGACY_LIMIT = 100_000  # pop(0) is quadratic, larger sizes take minutes
+
+
+# Reproduces the old cursor: tokens.pop(0) for every advance
+class PopStream:
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+
+    def peek(self):
+        return self.tokens[0] if self.tokens else None
+
+    def advance(self):
+        return self.tokens.pop(0) if self.tokens else None
+
+    def __len__(self):
+        return len(self.tokens)
+
+
+def expression_tokens(count):
+    tokens = [Eight.Token("INT", 1)]
+    while len(tokens) < count:
+        tokens.append(Eight.Token("PLUS", "+"))
+        tokens.append(Eight.Token("INT", 1))
+    return tokens
+
+
+def declaration_tokens(count):
+    tokens = []
+    i = 0
+    while len(tokens) < count:
+        tokens.extend([
+            test.Token("TYPE", "int"), test.Token("IDENTIFIER", f"v{i}"), test.Token("ASSIGNMENT", "="),
+            test.Token("NUMBER", i), test.Token("+", "+"), test.Token("NUMBER", 2), test.Token("SEMICOLON", ";"),
+        ])
+        i += 1
+    return tokens
+
+
+def run_expression(parser):
+    parser.expr()
+
+
+def run_declarations(parser):
+    while parser.current_token:
+        parser.statement()
+
+
+def time_parse(parser_class, tokens, run, legacy=False):
+    parser = parser_class(tokens)
+    if legacy:
+        parser.tokens = PopStream(tokens)
+        parser.current_token = parser.tokens.advance()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        run(parser)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    cases = (
+        ("Eight expr", Eight.Parser, expression_tokens, run_expression),
+        ("test decl", test.Parser, declaration_tokens, run_declarations),
+    )
+
+    print("| Case        | Tokens     | Cursor  | Seconds    | ns/token   |")
+    print("|-------------|------------|---------|------------|------------|")
+    for name, parser_class, make_tokens, run in cases:
+        for size in sizes:
+            tokens = make_tokens(size)
+            cursors = [("stream", False)]
+            if size <= LEGACY_LIMIT:
+                cursors.append(("pop(0)", True))
+            for cursor, legacy in cursors:
+                seconds = time_parse(parser_class, tokens, run, legacy)
+                print(f"| {name:<11} | {len(tokens):<10} | {cursor:<7} | {seconds:<10.4f} | {seconds / len(tokens) * 1e9:<10.1f} |")
+
+
+if __name__ == "__main__":
+    main()
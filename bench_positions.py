@@ -0,0 +1,87 @@
+import random
+import sys
+import time
+
+import Seven
+
+MEGABYTES = 100
+ERRORS = 10_000
+NAIVE_SAMPLE = 50  # the rescanning renderer is too slow to run all errors
+SEED = 1234
+
+
+def make_text(megabytes, seed=SEED):
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        line = " + ".join(f"x{rng.randint(0, 99)} * {rng.randint(1, 999)}" for _ in range(rng.randint(1, 6)))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+# What rendering cost before the line index: line and column come from
+# counting and searching back through the text for every diagnostic
+def naive_arrows(text, pos_start, pos_end):
+    line_start = text.rfind('\n', 0, pos_start) + 1
+    line_end = text.find('\n', pos_start)
+    if line_end < 0:
+        line_end = len(text)
+    text.count('\n', 0, pos_start)  # line number, for the message
+    col_start = pos_start - line_start
+    return text[line_start:line_end] + '\n' + ' ' * col_start + '^' * max(pos_end - pos_start, 1)
+
+
+# The lexer rejects '\n', and an error must render only its own line
+def check_lexer_errors():
+    for text, expected in (("1 + 2\n3", "1 + 2\n     ^"), ("1 + 2 $\n3 + 4\n5", "1 + 2 $\n      ^")):
+        lines = Seven.LineIndex()
+        ast, error = Seven.run(text, lines)
+        if error is None:
+            raise Exception(f"{text!r} lexed without an error")
+        message, pos_start, pos_end = error.args
+        if Seven.string_with_arrows(text, pos_start, pos_end, lines) != expected:
+            raise Exception(f"{text!r}: error rendered as {Seven.string_with_arrows(text, pos_start, pos_end, lines)!r}")
+
+
+def main():
+    check_lexer_errors()
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else MEGABYTES
+    text = make_text(megabytes)
+    rng = random.Random(SEED)
+    spans = []
+    for _ in range(ERRORS):
+        start = rng.randrange(len(text) - 1)
+        spans.append((start, start + 1))
+    spans.sort()
+
+    start = time.perf_counter()
+    lines = Seven.LineIndex.from_text(text)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rendered = [Seven.string_with_arrows(text, pos_start, pos_end, lines) for pos_start, pos_end in spans]
+    indexed_seconds = time.perf_counter() - start
+
+    sample = spans[::max(1, len(spans) // NAIVE_SAMPLE)][:NAIVE_SAMPLE]
+    start = time.perf_counter()
+    naive = [naive_arrows(text, pos_start, pos_end) for pos_start, pos_end in sample]
+    naive_seconds = time.perf_counter() - start
+
+    step = max(1, len(spans) // NAIVE_SAMPLE)
+    for i, expected in enumerate(naive):
+        if rendered[i * step] != expected:
+            raise Exception(f"Renderings differ at offset {sample[i][0]}")
+
+    naive_each = naive_seconds / len(sample)
+    print(f"Text: {len(text) / 1024 / 1024:.1f} MB, {len(lines.newlines) + 1} lines, {ERRORS} errors")
+    index_megabytes = lines.newlines.itemsize * len(lines.newlines) / 1024 / 1024
+    print(f"Line index build (once):        {index_seconds * 1000:10.1f} ms, {index_megabytes:.1f} MB")
+    print(f"Bisect rendering, all errors:   {indexed_seconds * 1000:10.1f} ms ({indexed_seconds / ERRORS * 1e6:.2f} us each)")
+    print(f"Rescan rendering, {len(sample)} sampled:  {naive_seconds * 1000:10.1f} ms ({naive_each * 1e6:.0f} us each,"
+          f" ~{naive_each * ERRORS:.1f} s for all)")
+
+
+if __name__ == "__main__":
+    main()
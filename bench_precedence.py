@@ -0,0 +1,106 @@
+import gc
+import random
+import sys
+import time
+
+import Six
+import guipart
+
+SIZES = (1_000, 10_000, 100_000)
+DEPTHS = (100, 1_000, 100_000)
+MIN_TOKENS_TIMED = 1_000_000  # repeat small cases until about this many tokens were parsed
+
+
+def flat_expression(operators, size, seed=1234):
+    rng = random.Random(seed)
+    parts = [str(rng.randint(1, 99))]
+    for _ in range(size - 1):
+        parts.append(rng.choice(operators))
+        parts.append(str(rng.randint(1, 99)))
+    return " ".join(parts)
+
+
+def nested_expression(depth):
+    return "(" * depth + "1 + 2" + ")" * depth
+
+
+def run(parser_class, tokens, method):
+    start = time.perf_counter()
+    result = getattr(parser_class(tokens), method)()
+    return time.perf_counter() - start, result
+
+
+# Both parsers run alternately and the best time of each is kept, so load
+# changes on the machine hit both the same way
+def compare(label, tokens, cases):
+    repeat = max(3, MIN_TOKENS_TIMED // len(tokens))
+    best = [None] * len(cases)
+    results = [None] * len(cases)
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for i, (parser_class, method) in enumerate(cases):
+                if best[i] == "RecursionError":
+                    continue
+                try:
+                    seconds, results[i] = run(parser_class, tokens, method)
+                except RecursionError:
+                    best[i] = "RecursionError"
+                    continue
+                best[i] = seconds if best[i] is None else min(best[i], seconds)
+    finally:
+        gc.enable()
+
+    row = f"| {label:<22} | {len(tokens):<8} |"
+    for seconds in best:
+        row += f" {seconds:<14} |" if isinstance(seconds, str) else f" {seconds * 1000:<14.3f} |"
+    recursive, table = results
+    if recursive is not None and recursive != table:
+        raise Exception(f"{label}: recursive parser gave {recursive}, precedence parser {table}")
+    if isinstance(best[0], float):
+        row += f" {best[0] / best[1]:<7.2f}x |"
+    else:
+        row += " -        |"
+    print(row)
+
+
+# Names have no value outside vector mode: both parsers must report them
+# rather than evaluate None. Words are letters and "_" only.
+def check_identifiers():
+    tokens = guipart.Lexer("x1 + 2").lex()
+    if [(token.token_type, token.value) for token in tokens] != [("IDENTIFIER", "x"), ("INT", 1), ("PLUS", "+"), ("INT", 2)]:
+        raise Exception("guipart: a word took in the digits after it")
+    for parser_class in (guipart.Parser, guipart.PrecedenceParser):
+        try:
+            parser_class(guipart.Lexer("1 + x").lex()).logical_or()
+        except Exception as e:
+            if str(e) != "Unbound identifier: x":
+                raise
+        else:
+            raise Exception(f"{parser_class.__name__} evaluated an unbound identifier")
+
+
+def main():
+    check_identifiers()
+    print(f"Recursion limit: {sys.getrecursionlimit()}")
+    print("| Case                   | Tokens   | Recursive ms   | Table ms       | Speedup  |")
+    print("|------------------------|----------|----------------|----------------|----------|")
+    # Six.Parser.term() never matches "*" and "/", so only + and - compare
+    six_cases = ((Six.Parser, "expr"), (Six.PrecedenceParser, "expr"))
+    guipart_cases = ((guipart.Parser, "expr"), (guipart.PrecedenceParser, "expr"))
+    for size in SIZES:
+        tokens = Six.Lexer(flat_expression("+-", size)).lex()
+        compare(f"Six flat {size}", tokens, six_cases)
+    for size in SIZES:
+        tokens = guipart.Lexer(flat_expression(["+", "-", "*", "%"], size)).lex()
+        compare(f"guipart flat {size}", tokens, guipart_cases)
+    for depth in DEPTHS:
+        tokens = Six.Lexer(nested_expression(depth)).lex()
+        compare(f"Six nested {depth}", tokens, six_cases)
+    for depth in DEPTHS:
+        tokens = guipart.Lexer(nested_expression(depth)).lex()
+        compare(f"guipart nested {depth}", tokens, guipart_cases)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import gc
+import random
+import time
+
+import sixgui
+
+SIZES = (1_000, 10_000, 100_000)
+ERROR_RATES = (0.0, 0.01, 0.1, 0.5)
+REPEAT = 3
+SEED = 1234
+
+# Each injected statement produces a known number of diagnostics and
+# declares nothing later statements read. A failed declaration still
+# declares its name, with value None, so the identifier table must be the
+# clean program's plus the names (and values) listed here. Stray closing
+# braces and missing semicolons must not swallow the statement after them,
+# and uses of a failed declaration must not be reported again.
+BROKEN = (
+    ("int e{i} = ;", 1, {"e{i}": None}),  # missing operand, error on the ";"
+    ("int e{i} = u{i};", 1, {"e{i}": None}),  # undeclared identifier
+    ("int e{i} = 1 + * 2;", 1, {"e{i}": None}),  # stray operator mid-expression
+    ("{{ int e{i} = ; }}", 1, {"e{i}": None}),  # error inside a block, recovered within it
+    (") ;", 1, {}),  # nothing consumed before the error
+    ("int e{i} = 4 / 0;", 1, {"e{i}": None}),  # runtime error
+    ("}}", 1, {}),  # stray closing brace, the next statement is kept
+    ("}}}}}}", 3, {}),
+    ("int e{i} = u{i}; int f{i} = e{i} + 1;", 1, {"e{i}": None, "f{i}": None}),  # no cascade from e{i}
+    ("int e{i}; int f{i} = e{i} + 1;", 1, {"e{i}": None, "f{i}": None}),  # reading an uninitialized variable
+    # missing ";": the next declaration is kept
+    ("int e{i} = 5 int f{i} = 6; int g{i} = e{i} + f{i};", 1, {"e{i}": 5, "f{i}": 6, "g{i}": 11}),
+)
+
+
+# Declarations reading earlier declarations, with broken statements injected
+# at the given rate. Returns (program, clean program, errors injected,
+# {name: value} the broken statements declare).
+def program(size, error_rate, seed=SEED):
+    rng = random.Random(seed)
+    lines, clean = [], []
+    injected = 0
+    unknown = {}
+    for i in range(size):
+        operands = [str(rng.randint(1, 99))]
+        for _ in range(rng.randint(0, 3)):
+            operand = f"v{rng.randrange(i)}" if i and rng.random() < 0.5 else str(rng.randint(1, 99))
+            operands.append(rng.choice("+-*") + " " + operand)
+        line = f"int v{i} = {' '.join(operands)};"
+        lines.append(line)
+        clean.append(line)
+        if rng.random() < error_rate:
+            template, errors, names = rng.choice(BROKEN)
+            lines.append(template.format(i=i))
+            injected += errors
+            unknown.update((name.format(i=i), value) for name, value in names.items())
+    return "\n".join(lines) + "\n", "\n".join(clean) + "\n", injected, unknown
+
+
+def parse(tokens):
+    parser = sixgui.Parser(tokens)
+    return parser.parse()[1], dict(parser.variables.items())
+
+
+def main():
+    print("| Statements | Error rate | Injected | Reported | Tokens     | Parse ms   | us/token   |")
+    print("|------------|------------|----------|----------|------------|------------|------------|")
+    for size in SIZES:
+        for error_rate in ERROR_RATES:
+            source, clean, injected, unknown = program(size, error_rate)
+            tokens, lex_errors = sixgui.Lexer(source).lex()
+            if lex_errors:
+                raise Exception(lex_errors[0])
+
+            best = None
+            gc.disable()
+            try:
+                for _ in range(REPEAT):
+                    start = time.perf_counter()
+                    errors, variables = parse(tokens)
+                    seconds = time.perf_counter() - start
+                    best = seconds if best is None else min(best, seconds)
+            finally:
+                gc.enable()
+
+            if len(errors) != injected:
+                raise Exception(f"{size}/{error_rate}: {injected} errors injected, {len(errors)} reported")
+            clean_errors, clean_variables = parse(sixgui.Lexer(clean).lex()[0])
+            clean_variables.update(unknown)
+            if clean_errors or variables != clean_variables:
+                raise Exception(f"{size}/{error_rate}: recovery changed the identifier table")
+            print(f"| {size:<10} | {error_rate:<10} | {injected:<8} | {len(errors):<8} | {len(tokens):<10} |"
+                  f" {best * 1000:<10.3f} | {best * 1e6 / len(tokens):<10.3f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from compileclient import CompileClient
+
+PROCESS_RUNS = 30
+CONNECTION_RUNS = 2_000
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# A small program like the ones shelled out to per job; distinct sources
+# miss the server's response cache, repeats of one source hit it
+def program(i):
+    return f"int x = {i};\nint y = x * 2 + {i % 7};\nint z = y - x;\n"
+
+
+def summary(label, seconds):
+    seconds = sorted(seconds)
+    p95 = seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))]
+    print(f"| {label:<38} | {len(seconds):<6} | {statistics.median(seconds) * 1000:<10.3f} | {p95 * 1000:<10.3f} |")
+
+
+def timed_process(command, source):
+    start = time.perf_counter()
+    subprocess.run(command, input=source, check=True, capture_output=True, text=True)
+    return time.perf_counter() - start
+
+
+def wait_for(path, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return
+        except OSError:
+            time.sleep(0.05)
+        finally:
+            probe.close()
+    raise Exception(f"Compile server did not start on {path}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "compile.sock")
+        server = subprocess.Popen([sys.executable, os.path.join(HERE, "compileserver.py"), "-s", path],
+                                  stdout=subprocess.DEVNULL)
+        try:
+            wait_for(path)
+            fresh = [sys.executable, os.path.join(HERE, "compileserver.py"), "--once", "test"]
+            client = [sys.executable, os.path.join(HERE, "compileclient.py"), "-s", path]
+
+            print("| Mode                                   | Runs   | Median ms  | p95 ms     |")
+            print("|----------------------------------------|--------|------------|------------|")
+            summary("fresh process (compile in process)",
+                    [timed_process(fresh, program(i)) for i in range(PROCESS_RUNS)])
+            summary("client process -> server, new source",
+                    [timed_process(client, program(PROCESS_RUNS + i)) for i in range(PROCESS_RUNS)])
+            summary("client process -> server, cached",
+                    [timed_process(client, program(0)) for _ in range(PROCESS_RUNS)])
+
+            with CompileClient(path) as connection:
+                for mode, source_of in (("open connection, new source", lambda i: program(10_000 + i)),
+                                        ("open connection, cached", lambda i: program(0))):
+                    seconds = []
+                    for i in range(CONNECTION_RUNS):
+                        source = source_of(i)
+                        start = time.perf_counter()
+                        response = connection.compile(source)
+                        seconds.append(time.perf_counter() - start)
+                        if "error" in response:
+                            raise Exception(response["error"])
+                    summary(mode, seconds)
+                print(f"\nServer: {connection.request(command='stats')}")
+                connection.request(command="shutdown")
+        finally:
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+import argparse
+import csv
+import gc
+import json
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import time
+
+import Eight
+import Fourth
+import Five
+import Seven
+import Six
+import Third
+import guipart
+import sixgui
+import test
+
+SIZES = (100, 1_000, 10_000)
+REPEAT = 5
+SEED = 1234
+
+
+# Synthetic inputs. All of them are deterministic for a given size and seed,
+# so results from different runs (and commits) are comparable.
+
+# One line, n operands. A divisor is always a nonzero literal and parentheses
+# nest at most three deep, so every evaluator can run it.
+def arithmetic(size, seed=SEED):
+    rng = random.Random(seed)
+    parts = []
+    depth = 0
+    for i in range(size):
+        if i:
+            operator = rng.choice("+-*/")
+            parts.append(operator)
+        else:
+            operator = None
+        if operator != "/" and depth < 3 and rng.random() < 0.1:
+            parts.append("(")
+            depth += 1
+        if rng.random() < 0.3:
+            parts.append(f"{rng.randint(1, 99)}.{rng.randint(1, 9)}")
+        else:
+            parts.append(str(rng.randint(1, 999)))
+        if depth and rng.random() < 0.2:
+            parts.append(")")
+            depth -= 1
+    parts.extend(")" * depth)
+    return " ".join(parts)
+
+
+# n integer declarations, each using earlier variables. No parentheses:
+# test.py and sixgui.py lex them as "(" but parse LEFT_PAREN.
+def declarations(size, seed=SEED):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(size):
+        operands = [str(rng.randint(1, 99))]
+        for _ in range(rng.randint(0, 3)):
+            operand = f"v{rng.randrange(i)}" if i and rng.random() < 0.5 else str(rng.randint(1, 99))
+            operands.append(rng.choice("+-*") + " " + operand)
+        lines.append(f"int v{i} = {' '.join(operands)};")
+    return "\n".join(lines) + "\n"
+
+
+# n function declarations nested up to 16 deep, inside one outer block
+# (the shape Six.Parser.block() accepts: its term() never sees "*" and
+# identifiers evaluate to their names, so returns only use literals).
+def nested_blocks(size, seed=SEED, max_depth=16):
+    rng = random.Random(seed)
+    lines = ["{"]
+    depth = 0
+    for i in range(size):
+        indent = "    " * (depth + 1)
+        lines.append(f"{indent}int f{i}(int a, int b) {{")
+        lines.append(f"{indent}    return {rng.randint(1, 99)} + {rng.randint(1, 99)} - {rng.randint(1, 99)};")
+        depth += 1
+        while depth and (depth == max_depth or rng.random() < 0.4):
+            depth -= 1
+            lines.append("    " * (depth + 1) + "}")
+    while depth:
+        depth -= 1
+        lines.append("    " * (depth + 1) + "}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+# Token-class workloads for the lexers alone: n whitespace-separated
+# identifiers of 4-24 characters, or n numbers of up to 12 digits (a third
+# of them with a fraction)
+def identifiers(size, seed=SEED):
+    rng = random.Random(seed)
+    rest = string.ascii_letters + string.digits + "_"
+    words = [rng.choice(string.ascii_letters) + "".join(rng.choice(rest) for _ in range(rng.randint(3, 23)))
+             for _ in range(size)]
+    return " ".join(words) + "\n"
+
+
+def numbers(size, seed=SEED):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(size):
+        number = str(rng.randint(0, 10 ** rng.randint(1, 12)))
+        if rng.random() < 0.3:
+            number += "." + str(rng.randint(0, 999_999))
+        parts.append(number)
+    return " ".join(parts) + "\n"
+
+
+WORKLOADS = {
+    "arithmetic": arithmetic, "declarations": declarations, "nested_blocks": nested_blocks,
+    "identifiers": identifiers, "numbers": numbers,
+}
+
+
+# Stage functions. lex takes the source, parse the lexer's output and
+# evaluate the parser's output. Parsers that interpret as they go (every one
+# but Seven's) only have a parse stage.
+
+def seven_lex(source):
+    tokens, error = Seven.Lexer(source).make_tokens()
+    if error:
+        raise error
+    return tokens
+
+
+def seven_parse(tokens):
+    result = Seven.Parser(tokens).parse()
+    if result.error:
+        raise result.error
+    return result.node
+
+
+# parse_program() does not skip the WHITESPACE tokens lexer() keeps
+def five_parse(tokens):
+    return Five.parse_program([token for token in tokens if token.type != 'WHITESPACE'])
+
+
+def six_parse(tokens):
+    Six.Parser(tokens).block()
+
+
+def eight_parse(tokens):
+    return Eight.Parser(tokens).expr()
+
+
+def guipart_parse(tokens):
+    return guipart.Parser(tokens).expr()
+
+
+def test_parse(tokens):
+    parser = test.Parser(tokens)
+    while parser.current_token:
+        parser.statement()
+    return parser.variables
+
+
+def sixgui_lex(source):
+    tokens, errors = sixgui.Lexer(source).lex()
+    if errors:
+        raise Exception(errors[0])
+    return tokens
+
+
+def sixgui_parse(tokens):
+    identifier_table, errors = sixgui.Parser(tokens).parse()
+    if errors:
+        raise Exception(errors[0])
+    return identifier_table
+
+
+# (variant, kind of lexer, {workload: {stage: function}})
+VARIANTS = (
+    ("Third", "regex sweep", {
+        "arithmetic": {"lex": Third.lexer},
+        "declarations": {"lex": Third.lexer},
+        "nested_blocks": {"lex": Third.lexer},
+    }),
+    ("Fourth", "regex sweep", {
+        "arithmetic": {"lex": Fourth.lexer},
+        "declarations": {"lex": Fourth.lexer},
+        "nested_blocks": {"lex": Fourth.lexer},
+    }),
+    ("Five", "per-position regex", {
+        "declarations": {"lex": Five.lexer, "parse": five_parse},
+        "nested_blocks": {"lex": Five.lexer},
+    }),
+    ("Six", "char loop", {
+        "nested_blocks": {"lex": lambda source: Six.Lexer(source).lex(), "parse": six_parse},
+        "identifiers": {"lex": lambda source: Six.Lexer(source).lex()},
+        "numbers": {"lex": lambda source: Six.Lexer(source).lex()},
+    }),
+    ("Seven", "char loop, namedtuple tokens", {
+        "arithmetic": {"lex": seven_lex, "parse": seven_parse, "evaluate": Seven.interpret},
+        "identifiers": {"lex": seven_lex},
+        "numbers": {"lex": seven_lex},
+    }),
+    ("Eight", "streaming char loop", {
+        "arithmetic": {"lex": lambda source: Eight.Lexer(source).lex(), "parse": eight_parse},
+        "numbers": {"lex": lambda source: Eight.Lexer(source).lex()},
+    }),
+    ("test", "streaming char loop", {
+        "declarations": {"lex": lambda source: test.Lexer(source).lex(), "parse": test_parse},
+        "nested_blocks": {"lex": lambda source: test.Lexer(source).lex()},
+        "identifiers": {"lex": lambda source: test.Lexer(source).lex()},
+        "numbers": {"lex": lambda source: test.Lexer(source).lex()},
+    }),
+    ("test.lex_buffer", "bytes regex, span tokens", {
+        "declarations": {"lex": lambda source: test.lex_buffer(source.encode()), "parse": test_parse},
+    }),
+    ("sixgui", "char loop", {
+        "declarations": {"lex": sixgui_lex, "parse": sixgui_parse},
+        "nested_blocks": {"lex": sixgui_lex},
+        "identifiers": {"lex": sixgui_lex},
+        "numbers": {"lex": sixgui_lex},
+    }),
+    ("guipart", "char loop", {
+        "arithmetic": {"lex": lambda source: guipart.Lexer(source).lex(), "parse": guipart_parse},
+        "identifiers": {"lex": lambda source: guipart.Lexer(source).lex()},
+        "numbers": {"lex": lambda source: guipart.Lexer(source).lex()},
+    }),
+)
+
+STAGES = ("lex", "parse", "evaluate")
+RECURSION_LIMIT = 50_000  # Seven.interpret() recurses once per operator
+
+
+def time_stage(func, arg, repeat):
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func(arg)
+            times.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return result, times
+
+
+def run_case(variant, lexer_kind, workload, size, stages, repeat):
+    source = WORKLOADS[workload](size)
+    results = []
+    value = source
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+        try:
+            output, times = time_stage(stages[stage], value, repeat)
+        except (Exception, SystemExit) as e:  # Eight.Parser.error() calls exit()
+            results.append({
+                "variant": variant, "lexer": lexer_kind, "workload": workload, "size": size,
+                "stage": stage, "error": f"{type(e).__name__}: {e}",
+            })
+            break
+        if stage == "lex":
+            token_count = len(output)
+        results.append({
+            "variant": variant, "lexer": lexer_kind, "workload": workload, "size": size,
+            "stage": stage, "bytes": len(source), "tokens": token_count, "repeat": repeat,
+            "best": min(times), "median": statistics.median(times),
+            "tokens_per_sec": token_count / min(times) if min(times) else None,
+        })
+        value = output
+    return results
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "sizes": args.sizes,
+        "repeat": args.repeat,
+        "seed": SEED,
+    }
+
+
+def result_key(result):
+    return result["variant"], result["workload"], result["size"], result["stage"]
+
+
+def write_table(results, output, baseline=None):
+    header = "| Variant          | Workload      | Size   | Stage    | Tokens   | Best ms    | Tokens/sec   |"
+    if baseline:
+        header += " vs baseline |"
+    output.write(header + "\n")
+    output.write("|" + "|".join("-" * len(column) for column in header.split("|")[1:-1]) + "|\n")
+    for result in results:
+        row = f"| {result['variant']:<16} | {result['workload']:<13} | {result['size']:<6} | {result['stage']:<8} |"
+        if "error" in result:
+            row += f" {result['error']}"
+        else:
+            row += f" {result['tokens']:<8} | {result['best'] * 1000:<10.3f} | {result['tokens_per_sec']:<12.0f} |"
+            old = baseline.get(result_key(result)) if baseline else None
+            if old:
+                row += f" {old['best'] / result['best']:<10.2f}x |"
+        output.write(row + "\n")
+
+
+def write_csv(results, output):
+    fields = ("variant", "lexer", "workload", "size", "stage", "bytes", "tokens", "repeat",
+              "best", "median", "tokens_per_sec", "error")
+    writer = csv.DictWriter(output, fields)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the lex/parse/evaluate stages of every lexer and parser.")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("-r", "--repeat", type=int, default=REPEAT)
+    parser.add_argument("-v", "--variant", action="append", help="only these variants (repeatable)")
+    parser.add_argument("-w", "--workload", action="append", choices=sorted(WORKLOADS))
+    parser.add_argument("-f", "--format", choices=("table", "json", "csv"), default="table")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    parser.add_argument("-b", "--baseline", help="earlier --format json output to compare against")
+    args = parser.parse_args(argv)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+
+    results = []
+    for variant, lexer_kind, workloads in VARIANTS:
+        if args.variant and variant not in args.variant:
+            continue
+        for workload, stages in workloads.items():
+            if args.workload and workload not in args.workload:
+                continue
+            for size in args.sizes:
+                results.extend(run_case(variant, lexer_kind, workload, size, stages, args.repeat))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as previous:
+            baseline = {result_key(result): result for result in json.load(previous)["results"] if "best" in result}
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump({"meta": metadata(args), "results": results}, output, indent=1)
+            output.write("\n")
+        elif args.format == "csv":
+            write_csv(results, output)
+        else:
+            write_table(results, output, baseline)
+    finally:
+        if args.output:
+            output.close()
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
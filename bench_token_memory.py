@@ -0,0 +1,70 @@
+import sys
+import tracemalloc
+
+import test
+from tokenbuffer import TokenBuffer
+
+COUNT = 1_000_000
+
+
+# The Token class as it was before __slots__
+class DictToken:
+    def __init__(self, token_type, value):
+        self.token_type = token_type
+        self.value = value
+
+
+# Mimics a lexer run: a fresh value object per token, as slicing/int() produce
+def token_rows(count):
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            yield "IDENTIFIER", f"var{i % 500}", i * 4, i * 4 + 3
+        elif kind == 1:
+            yield "ASSIGNMENT", "=", i * 4, i * 4 + 1
+        elif kind == 2:
+            yield "NUMBER", int(str(i % 1000)), i * 4, i * 4 + 3
+        else:
+            yield "SEMICOLON", ";", i * 4, i * 4 + 1
+
+
+def measure(build, count):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current - before, peak - before
+
+
+def build_list(token_class):
+    return lambda count: [token_class(token_type, value) for token_type, value, _, _ in token_rows(count)]
+
+
+def build_buffer(count):
+    buffer = TokenBuffer()
+    for row in token_rows(count):
+        buffer.add(*row)
+    return buffer
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    cases = (
+        ("list of dict Token", build_list(DictToken)),
+        ("list of slots Token", build_list(test.Token)),
+        ("TokenBuffer", build_buffer),
+    )
+
+    print(f"Tokens: {count}")
+    print("| Storage              | Retained MB | Peak MB    | Bytes/token |")
+    print("|----------------------|-------------|------------|-------------|")
+    for name, build in cases:
+        retained, peak = measure(build, count)
+        print(f"| {name:<20} | {retained / 1e6:<11.1f} | {peak / 1e6:<10.1f} | {retained / count:<11.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import gc
+import re
+import sys
+import time
+
+import Third
+import Fourth
+
+SNIPPET = """int add(int a, int b) {
+    float scale = 2.5;
+    if (a) { return a * scale + b / 3; }
+    while (b) { b = b - 1; }
+    return a + b;
+}
+"""
+
+
+# The per-category sweep lexer the modules used before the master regex
+def sweep_lexer(program, token_types, token_class):
+    tokens = []
+    for type, pattern in token_types.items():
+        if isinstance(pattern, set):
+            regex = re.compile(fr'\b(?:{"|".join(re.escape(v) for v in pattern)})\b')
+        else:
+            regex = re.compile(pattern)
+        for match in regex.finditer(program):
+            tokens.append(token_class(type, match.group(0)))
+    return tokens
+
+
+def generate_program(size_mb):
+    copies = max(1, int(size_mb * 1024 * 1024) // len(SNIPPET))
+    return SNIPPET * copies
+
+
+def throughput(func, program, repeat=3):
+    best = float("inf")
+    gc.disable()  # same as timeit: keep collector pauses out of the numbers
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(program)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return len(program) / (1024 * 1024) / best, best
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    program = generate_program(size_mb)
+
+    print(f"Input: {len(program) / (1024 * 1024):.2f} MB")
+    print("| Module     | Lexer        | MB/s       | Seconds    |")
+    print("|------------|--------------|------------|------------|")
+    for module in (Third, Fourth):
+        sweep = lambda text: sweep_lexer(text, module.TOKEN_TYPES, module.Token)
+        for name, func in (("sweep", sweep), ("master regex", module.lexer)):
+            rate, seconds = throughput(func, program)
+            print(f"| {module.__name__:<10} | {name:<12} | {rate:<10.2f} | {seconds:<10.3f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import hashlib
+import inspect
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from tokenbuffer import TYPE_NAMES, TokenBuffer, type_code
+
+# On-disk cache of lexer/parser output, one file per (name, source):
+#
+#   header   magic, format version, byte order, spec digest, source digest,
+#            section count
+#   sections each a 16-byte header (array typecode, item size, byte length)
+#            followed by the raw array bytes, padded to 8 bytes
+#
+# Sections are native-endian arrays, so loading maps the file and casts
+# memoryviews over it: no per-token or per-node unpickling. A file whose
+# spec digest (the lexer/parser source it was produced by) or format version
+# differs from the caller's is a miss and gets overwritten on the next store.
+FORMAT_VERSION = 1
+MAGIC = b"CBC\x00"
+HEADER = struct.Struct("<4sHB16s16sI")
+SECTION = struct.Struct("<cB6xQ")
+DEFAULT_DIRECTORY = "__compilecache__"
+
+# value pool tags
+NONE, INT, FLOAT, STR = range(4)
+
+
+# Digest of everything that decides what a lexer or parser produces: the
+# source of the given modules/classes/functions, the repr of anything else
+# (keyword tables, character sets, patterns)
+@lru_cache(maxsize=None)
+def spec_digest(*parts):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(FORMAT_VERSION).encode())
+    for part in parts:
+        if inspect.ismodule(part) or inspect.isclass(part) or inspect.isfunction(part):
+            text = inspect.getsource(part)
+        else:
+            text = repr(part)
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.digest()
+
+
+def source_digest(source):
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    return hashlib.blake2b(source, digest_size=16).digest()
+
+
+# A list of None/int/float/str values as three sections: tags, end offsets
+# into a UTF-8 blob, and the blob itself
+def pack_values(values):
+    tags = array('B')
+    ends = array('q')
+    parts = []
+    end = 0
+    for value in values:
+        if value is None:
+            tag, text = NONE, ""
+        elif value.__class__ is int:
+            tag, text = INT, str(value)
+        elif value.__class__ is float:
+            tag, text = FLOAT, repr(value)
+        elif value.__class__ is str:
+            tag, text = STR, value
+        else:
+            raise Exception(f"Cannot cache value of type {type(value).__name__}")
+        data = text.encode("utf-8")
+        parts.append(data)
+        end += len(data)
+        tags.append(tag)
+        ends.append(end)
+    return [tags, ends, array('B', b"".join(parts))]
+
+
+def unpack_values(tags, ends, blob):
+    blob = bytes(blob)
+    values = []
+    start = 0
+    for tag, end in zip(tags, ends):
+        if tag == NONE:
+            values.append(None)
+        else:
+            text = blob[start:end].decode("utf-8")
+            values.append(int(text) if tag == INT else float(text) if tag == FLOAT else text)
+        start = end
+    return values
+
+
+class BinaryCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, name, source):
+        return os.path.join(self.directory, f"{name}-{source_digest(source).hex()}.bin")
+
+    def store(self, name, source, spec, sections):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(name, source)
+        # written aside and renamed, so readers (other batch workers) never
+        # see a partial file
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as output:
+            output.write(HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == "little", spec,
+                                     source_digest(source), len(sections)))
+            for section in sections:
+                data = section.tobytes()
+                output.write(SECTION.pack(section.typecode.encode(), section.itemsize, len(data)))
+                output.write(data)
+                output.write(b"\x00" * (-len(data) % 8))
+        os.replace(temp, path)
+
+    # Returns the sections as read-only memoryviews into the mapped file, or
+    # None if there is no valid entry for this source and spec
+    def load(self, name, source, spec):
+        try:
+            with open(self.path(name, source), "rb") as cached:
+                data = mmap.mmap(cached.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        magic, version, little, cached_spec, cached_source, count = HEADER.unpack_from(data, 0) \
+            if len(data) >= HEADER.size else (None,) * 6
+        if (magic != MAGIC or version != FORMAT_VERSION or little != (sys.byteorder == "little")
+                or cached_spec != spec or cached_source != source_digest(source)):
+            self.misses += 1
+            return None
+
+        view = memoryview(data)
+        sections = []
+        offset = HEADER.size
+        for _ in range(count):
+            if offset + SECTION.size > len(data):
+                self.misses += 1
+                return None
+            typecode, itemsize, length = SECTION.unpack_from(data, offset)
+            typecode = typecode.decode()
+            offset += SECTION.size
+            # written on another platform, or truncated
+            if array(typecode).itemsize != itemsize or offset + length > len(data):
+                self.misses += 1
+                return None
+            sections.append(view[offset:offset + length].cast(typecode))
+            offset += length + (-length % 8)
+        self.hits += 1
+        return sections
+
+    def store_tokens(self, name, source, spec, tokens):
+        if not isinstance(tokens, TokenBuffer) or tokens.source is not None:
+            tokens = TokenBuffer.from_tokens(tokens)
+        type_names = pack_values(TYPE_NAMES)
+        values = pack_values(tokens.values)
+        self.store(name, source, spec, type_names + values +
+                   [tokens.types, tokens.starts, tokens.ends, tokens.value_ids])
+
+    # The loaded TokenBuffer's columns are views into the cache file, so it
+    # is read-only: indexing and iteration work, add()/append() do not.
+    def load_tokens(self, name, source, spec):
+        sections = self.load(name, source, spec)
+        if sections is None:
+            return None
+        names = unpack_values(*sections[0:3])
+        values = unpack_values(*sections[3:6])
+        types, starts, ends, value_ids = sections[6:10]
+
+        # type codes are per process; only remap when they disagree
+        codes = [type_code(type_name) for type_name in names]
+        if codes != list(range(len(codes))):
+            types = array('H', map(codes.__getitem__, types))
+
+        tokens = TokenBuffer()
+        tokens.types = types
+        tokens.starts = starts
+        tokens.ends = ends
+        tokens.value_ids = value_ids
+        tokens.values = values
+        return tokens
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
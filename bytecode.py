@@ -0,0 +1,244 @@
+from array import array
+
+from symboltable import SymbolTable
+
+# Opcodes. LOAD_CONST, LOAD_VAR and STORE_VAR take a two-byte little-endian
+# argument (constant index or variable slot); the rest take none. An argument
+# above MAX_ARG is split: EXTENDED_ARG prefixes carry its higher 16-bit
+# parts, which the VM shifts into the next instruction's argument.
+LOAD_CONST = 0
+LOAD_VAR = 1
+STORE_VAR = 2
+ADD = 3
+SUB = 4
+MUL = 5
+DIV = 6
+EXTENDED_ARG = 7
+
+OPCODE_NAMES = ["LOAD_CONST", "LOAD_VAR", "STORE_VAR", "ADD", "SUB", "MUL", "DIV", "EXTENDED_ARG"]
+HAS_ARG = {LOAD_CONST, LOAD_VAR, STORE_VAR, EXTENDED_ARG}
+MAX_ARG = 0xFFFF
+
+
+class Program:
+    # Compiled declarations: code, constant pool, the name of each slot and
+    # the slot each name's most recent declaration got ({name: slot}, in
+    # first-declaration order).
+    def __init__(self, code, constants, names, variables):
+        self.code = code
+        self.constants = constants
+        self.names = names
+        self.variables = variables
+
+    def __len__(self):
+        return len(self.code)
+
+
+class ProgramBuilder:
+    def __init__(self):
+        self.code = array('B')
+        self.constants = []
+        self.constant_index = {}
+        self.symbols = SymbolTable()
+
+    def emit(self, opcode, arg=None):
+        if arg is not None and arg > MAX_ARG:
+            self.emit(EXTENDED_ARG, arg >> 16)
+            arg &= MAX_ARG
+        self.code.append(opcode)
+        if arg is not None:
+            self.code.append(arg & 0xFF)
+            self.code.append(arg >> 8)
+
+    def constant(self, value):
+        key = (value.__class__, value)
+        index = self.constant_index.get(key)
+        if index is None:
+            index = self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def load_const(self, value):
+        self.emit(LOAD_CONST, self.constant(value))
+
+    # Names are resolved to slots here, once: an undeclared name is a
+    # compile error and the VM only ever sees slot numbers
+    def load_var(self, name):
+        self.emit(LOAD_VAR, self.symbols.resolve(name))
+
+    def declare_var(self, name):
+        self.emit(STORE_VAR, self.symbols.declare(name))
+
+    def store_var(self, name):
+        self.emit(STORE_VAR, self.symbols.store(name))
+
+    def build(self):
+        return Program(self.code, self.constants, list(self.symbols.names), dict(self.symbols.latest))
+
+
+# Runs a Program and returns its variables as {name: value}, like the
+# interpreting Parser's self.variables.
+def run(program):
+    code = program.code
+    constants = program.constants
+    slots = [None] * len(program.names)
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    pc = 0
+    end = len(code)
+
+    while pc < end:
+        op = code[pc]
+        if op == LOAD_VAR:
+            push(slots[code[pc + 1] | code[pc + 2] << 8])
+            pc += 3
+        elif op == LOAD_CONST:
+            push(constants[code[pc + 1] | code[pc + 2] << 8])
+            pc += 3
+        elif op == STORE_VAR:
+            slots[code[pc + 1] | code[pc + 2] << 8] = pop()
+            pc += 3
+        elif op == ADD:
+            right = pop()
+            stack[-1] = stack[-1] + right
+            pc += 1
+        elif op == MUL:
+            right = pop()
+            stack[-1] = stack[-1] * right
+            pc += 1
+        elif op == SUB:
+            right = pop()
+            stack[-1] = stack[-1] - right
+            pc += 1
+        elif op == DIV:
+            right = pop()
+            if right == 0:
+                raise Exception("Division by zero")
+            stack[-1] = stack[-1] / right
+            pc += 1
+        elif op == EXTENDED_ARG:
+            # Wide argument: gather the prefixes and run the instruction
+            # here, so the common opcodes above never check for a prefix
+            arg = 0
+            while op == EXTENDED_ARG:
+                arg = (arg | code[pc + 1] | code[pc + 2] << 8) << 16
+                pc += 3
+                op = code[pc]
+            arg |= code[pc + 1] | code[pc + 2] << 8
+            pc += 3
+            if op == LOAD_VAR:
+                push(slots[arg])
+            elif op == LOAD_CONST:
+                push(constants[arg])
+            elif op == STORE_VAR:
+                slots[arg] = pop()
+            else:
+                raise Exception(f"Invalid opcode {op} after EXTENDED_ARG at {pc - 3}")
+        else:
+            raise Exception(f"Invalid opcode {op} at {pc}")
+
+    return {name: slots[slot] for name, slot in program.variables.items()}
+
+
+def disassemble(program):
+    lines = []
+    code = program.code
+    pc = 0
+    extended = 0
+    while pc < len(code):
+        op = code[pc]
+        if op == EXTENDED_ARG:
+            extended = (extended | code[pc + 1] | code[pc + 2] << 8) << 16
+            lines.append(f"{pc:>6} {OPCODE_NAMES[op]} {code[pc + 1] | code[pc + 2] << 8}")
+            pc += 3
+        elif op in HAS_ARG:
+            arg = extended | code[pc + 1] | code[pc + 2] << 8
+            extended = 0
+            detail = repr(program.constants[arg]) if op == LOAD_CONST else program.names[arg]
+            lines.append(f"{pc:>6} {OPCODE_NAMES[op]:<10} {arg:<5} ({detail})")
+            pc += 3
+        else:
+            lines.append(f"{pc:>6} {OPCODE_NAMES[op]}")
+            pc += 1
+    return "\n".join(lines)
+
+
+class DeclarationCompilation:
+    # Mixin for the declaration Parsers of test.py and sixgui.py: the same
+    # grammar and eat()/error() behaviour, but factor/term/expr/statement
+    # emit code into self.builder instead of computing values. The builder's
+    # symbol table replaces self.variables, so the Parser's block() scopes it.
+    def __init__(self, tokens):
+        super().__init__(tokens)
+        self.builder = ProgramBuilder()
+        self.variables = self.builder.symbols
+
+    def factor(self):
+        token_type = self.current_token.token_type
+        if token_type in ("NUMBER", "TYPE"):
+            self.builder.load_const(self.current_token.value)
+            self.eat(token_type)
+        elif token_type == "IDENTIFIER":
+            name = self.current_token.value
+            self.eat("IDENTIFIER")
+            self.builder.load_var(name)
+        elif token_type == "LEFT_PAREN":
+            self.eat("LEFT_PAREN")
+            self.expr()
+            self.eat("RIGHT_PAREN")
+        else:
+            self.error(f"Unexpected token: {token_type}")
+
+    def term(self):
+        self.factor()
+
+        while self.current_token and self.current_token.token_type in ("*", "/"):
+            operator = self.current_token.token_type
+            self.eat(operator)
+            self.factor()
+            self.builder.emit(MUL if operator == "*" else DIV)
+
+    def expr(self):
+        self.term()
+
+        while self.current_token and self.current_token.token_type in ("+", "-"):
+            operator = self.current_token.token_type
+            self.eat(operator)
+            self.term()
+            self.builder.emit(ADD if operator == "+" else SUB)
+
+    def statement(self):
+        if self.current_token.token_type == "SEMICOLON":
+            self.eat("SEMICOLON")
+        elif self.current_token.token_type == "TYPE":
+            self.variable_declaration()
+        elif self.current_token.token_type in ("LEFT_BRACE", "{"):
+            self.block()
+        else:
+            self.expr()
+            self.builder.store_var(self.current_token.value)
+            self.eat("IDENTIFIER")
+            self.eat("SEMICOLON")
+
+    def variable_declaration(self):
+        self.eat("TYPE")
+        var_name = self.current_token.value
+        self.eat("IDENTIFIER")
+
+        if self.current_token.token_type == "ASSIGNMENT":
+            self.eat("ASSIGNMENT")
+            self.expr()
+            self.builder.declare_var(var_name)
+            self.eat("SEMICOLON")
+        elif self.current_token.token_type == "SEMICOLON":
+            self.builder.load_const(None)
+            self.builder.declare_var(var_name)
+            self.eat("SEMICOLON")
+        else:
+            self.error()
+
+    def compile(self):
+        while self.current_token:
+            self.statement()
+        return self.builder.build()
@@ -0,0 +1,68 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+
+class CompileCache:
+    # LRU map from a source digest to whatever a compile produced (tokens,
+    # parse results, rendered tables). Bounded both by entry count and by the
+    # total size the caller reports for each entry.
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def digest(source):
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, source):
+        key = self.digest(source)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, source, value, size):
+        key = self.digest(source)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self.total_bytes -= self.entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __str__(self):
+        stats = self.stats()
+        return (f"Cache: {stats['entries']} entries, {stats['bytes']} bytes, "
+                f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+
+
+# Rough in-memory size of a compile result: its tokens plus rendered strings
+def entry_size(tokens, *texts):
+    size = sum(sys.getsizeof(token) + sys.getsizeof(token.value) for token in tokens)
+    return size + sum(sys.getsizeof(text) for text in texts)
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Kept free of the compiler modules: starting this client should cost no more
+# than the interpreter itself (see compileserver.py for the daemon side).
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"compileserver-{os.getuid()}.sock")
+
+
+class CompileClient:
+    # One connection to a compile server; requests and responses are single
+    # JSON lines, so a connection can be reused for any number of requests.
+    def __init__(self, path=DEFAULT_SOCKET):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.reader = self.socket.makefile("rb")
+
+    def request(self, **fields):
+        self.socket.sendall(json.dumps(fields).encode("utf-8") + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise Exception("Compile server closed the connection")
+        return json.loads(line)
+
+    def compile(self, source, pipeline="test"):
+        return self.request(command="compile", pipeline=pipeline, source=source)
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a source file on a running compile server.")
+    parser.add_argument("path", nargs="?", default="-", help="source file, - for stdin")
+    parser.add_argument("-s", "--socket", default=DEFAULT_SOCKET, help="server socket path")
+    parser.add_argument("-p", "--pipeline", default="test", help="test (declarations) or eight (expression)")
+    parser.add_argument("--stats", action="store_true", help="print the server's counters instead")
+    parser.add_argument("--shutdown", action="store_true", help="stop the server")
+    args = parser.parse_args(argv)
+
+    with CompileClient(args.socket) as client:
+        if args.stats:
+            response = client.request(command="stats")
+        elif args.shutdown:
+            response = client.request(command="shutdown")
+        elif args.path == "-":
+            response = client.compile(sys.stdin.read(), args.pipeline)
+        else:
+            with open(args.path) as source:
+                response = client.compile(source.read(), args.pipeline)
+    json.dump(response, sys.stdout)
+    sys.stdout.write("\n")
+    return 1 if "error" in response else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
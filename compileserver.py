@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+import Eight
+import test
+from compilecache import CompileCache
+from compileclient import DEFAULT_SOCKET
+
+
+# Pipelines fill in the response as they go, so a parse error still returns
+# the tokens. Token values are plain ints/floats/strs and go into JSON as is.
+def compile_declarations(source, response):
+    tokens = test.Lexer(source).lex()
+    response["tokens"] = [[token.token_type, token.value] for token in tokens]
+    parser = test.Parser(tokens)
+    while parser.current_token:
+        parser.statement()
+    response["identifiers"] = dict(parser.variables.items())
+
+
+def compile_expression(source, response):
+    tokens = Eight.Lexer(source).lex()
+    response["tokens"] = [[token.token_type, token.value] for token in tokens]
+    response["result"] = Eight.Parser(tokens).expr()
+
+
+PIPELINES = {"test": compile_declarations, "eight": compile_expression}
+
+
+def run_pipeline(pipeline, source):
+    response = {}
+    if pipeline not in PIPELINES:
+        response["error"] = f"Unknown pipeline: {pipeline}"
+        return response
+    try:
+        PIPELINES[pipeline](source, response)
+    except (Exception, SystemExit) as e:  # Eight.Parser.error() calls exit()
+        response["error"] = f"{type(e).__name__}: {e}"
+    return response
+
+
+def encode(response):
+    return json.dumps(response).encode("utf-8") + b"\n"
+
+
+class CompileHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            self.wfile.write(self.server.respond(line))
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Long-lived compiler behind a Unix socket: the interpreter, the lexer and
+    # parser modules and the response cache stay warm between requests.
+    # Each connection gets a thread and may send any number of requests.
+    daemon_threads = True
+
+    def __init__(self, path=DEFAULT_SOCKET, cache=None):
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.remove(path)  # left behind by a server that died
+            else:
+                raise Exception(f"A compile server is already listening on {path}")
+            finally:
+                probe.close()
+        super().__init__(path, CompileHandler)
+        self.path = path
+        self.cache = CompileCache() if cache is None else cache
+        self.started = time.time()
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def respond(self, line):
+        with self.lock:
+            self.requests += 1
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return encode({"error": f"Bad request: {e}"})
+
+        command = request.get("command", "compile")
+        if command == "stats":
+            stats = self.cache.stats()
+            stats.update(requests=self.requests, uptime=time.time() - self.started)
+            return encode(stats)
+        if command == "shutdown":
+            # shutdown() waits for serve_forever(), which is waiting for us
+            threading.Thread(target=self.shutdown).start()
+            return encode({"ok": True})
+        if command != "compile":
+            return encode({"error": f"Unknown command: {command}"})
+
+        pipeline = request.get("pipeline", "test")
+        source = request.get("source", "")
+        key = f"{pipeline}\0{source}"
+        response = self.cache.get(key)
+        if response is None:
+            response = encode(run_pipeline(pipeline, source))
+            self.cache.put(key, response, len(response))
+        return response
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve compile requests over a Unix domain socket.")
+    parser.add_argument("-s", "--socket", default=DEFAULT_SOCKET, help="socket path")
+    parser.add_argument("--once", metavar="PIPELINE",
+                        help="compile stdin in this process and print the response, without serving")
+    args = parser.parse_args(argv)
+
+    if args.once:
+        sys.stdout.buffer.write(encode(run_pipeline(args.once, sys.stdin.read())))
+        return 0
+
+    server = CompileServer(args.socket)
+    print(f"Listening on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,22 @@
+import operator
 import re
+import sys
 import tkinter as tk
 from tkinter import Entry, Label, Button, scrolledtext
 
+from backgroundcompile import BackgroundCompiler
+from compilecache import CompileCache, entry_size
+from precedence import OperatorTable, evaluate
+from profiling import NULL_PROFILER
+from tableview import VirtualTableView
+from tokentable import TokenTable
+from tokenstream import TokenStream
+from vectorized import VectorEvaluation
+
 
 class Token:
+    __slots__ = ("token_type", "value")
+
     def __init__(self, token_type, value):
         self.token_type = token_type
         self.value = value
@@ -11,7 +24,28 @@ class Token:
     def __str__(self):
         return f"| {self.token_type:<18}| {self.value:<11}|"
 
-/(200+3*4.5+4*8.2/2)-2
+# Number and identifier runs are found with one match each and sliced from
+# the text, instead of built up a character at a time through advance().
+# Words are letters and "_" only: "x1" is x followed by 1.
+NUMBER_RUN = re.compile(r'[\d.]*')
+WORD_RUN = re.compile(r'[^\W\d]*')
+SPACE_RUN = re.compile(r'\s*')
+
+# Tokens are never modified after lexing, so every occurrence of an
+# operator or logical word shares one Token. These tables (and HANDLERS
+# below) are built once at import and never changed.
+PUNCTUATION = {char: Token(token_type, char) for char, token_type in (
+    ("+", "PLUS"), ("-", "MINUS"), ("/", "DIVIDE"), ("%", "MODULO"), ("(", "LPAREN"), (")", "RPAREN"),
+)}
+MULTIPLY = Token("MULTIPLY", "*")
+POWER = Token("POWER", "**")
+# keyed by the lower-cased word
+LOGICAL_WORDS = {
+    "true": Token("BOOL", True), "false": Token("BOOL", False),
+    "and": Token("AND", "and"), "or": Token("OR", "or"), "not": Token("NOT", "not"),
+}
+
+
 class Lexer:
     def __init__(self, input_text):
         self.input_text = input_text
@@ -25,57 +59,51 @@ class Lexer:
         else:
             self.current_char = None
 
-    def lex(self):
-        tokens = []
+    def skip_to(self, position):
+        self.position = position
+        self.current_char = self.input_text[position] if position < len(self.input_text) else None
+
+    def lex(self, tokens=None):
+        if tokens is None:
+            tokens = []
+        handlers = HANDLERS
+        append = tokens.append
         while self.current_char is not None:
-            if self.current_char.isspace():
-                self.advance()
-            elif self.current_char.isdigit() or self.current_char == '.':
-                tokens.append(self.parse_number())
-            elif self.current_char == "+":
-                tokens.append(Token("PLUS", self.current_char))
-                self.advance()
-            elif self.current_char == "-":
-                tokens.append(Token("MINUS", self.current_char))
-                self.advance()
-            elif self.current_char == "*":
-                tokens.append(Token("MULTIPLY", self.current_char))
-                self.advance()
-            elif self.current_char == "/":
-                tokens.append(Token("DIVIDE", self.current_char))
-                self.advance()
-            elif self.current_char == "%":
-                tokens.append(Token("MODULO", self.current_char))
-                self.advance()
-            elif self.current_char == "(":
-                tokens.append(Token("LPAREN", self.current_char))
-                self.advance()
-            elif self.current_char == ")":
-                tokens.append(Token("RPAREN", self.current_char))
-                self.advance()
-            elif self.current_char == "**":
-                tokens.append(Token("POWER", self.current_char))
-                self.advance()
-            elif self.current_char.isalpha():
-                tokens.append(self.parse_logical())
-            else:
-                raise Exception(f"Invalid character: {self.current_char}")
+            handler = handlers.get(self.current_char) or char_handler(self.current_char)
+            token = handler(self)
+            if token is not None:
+                append(token)
 
         return tokens
 
-    def parse_number(self):
-        result = ""
-        decimal_count = 0
-
-        while self.current_char is not None and (self.current_char.isdigit() or self.current_char == '.'):
-            result += self.current_char
+    # a single space is one advance(); longer runs one match
+    def skip_space(self):
+        self.advance()
+        if self.current_char is not None and self.current_char.isspace():
+            self.skip_to(SPACE_RUN.match(self.input_text, self.position).end())
+
+    def punctuation(self):
+        token = PUNCTUATION[self.current_char]
+        self.advance()
+        return token
+
+    # "*" or "**"
+    def star(self):
+        self.advance()
+        if self.current_char == "*":
+            self.advance()
+            return POWER
+        return MULTIPLY
 
-            if self.current_char == '.':
-                decimal_count += 1
-                if decimal_count > 1:
-                    raise Exception("Invalid number")
+    def invalid(self):
+        raise Exception(f"Invalid character: {self.current_char}")
 
-            self.advance()
+    def parse_number(self):
+        end = NUMBER_RUN.match(self.input_text, self.position).end()
+        result = self.input_text[self.position:end]
+        if result.count('.') > 1:
+            raise Exception("Invalid number")
+        self.skip_to(end)
 
         if '.' in result:
             return Token("FLOAT", float(result))
@@ -83,29 +111,43 @@ class Lexer:
             return Token("INT", int(result))
 # not used on purpose
     def parse_logical(self):
-        result = ""
-        while self.current_char is not None and (self.current_char.isalpha() or self.current_char == '_'):
-            result += self.current_char
-            self.advance()
-
-        if result.lower() == "true":
-            return Token("BOOL", True)
-        elif result.lower() == "false":
-            return Token("BOOL", False)
-        elif result.lower() == "and":
-            return Token("AND", "and")
-        elif result.lower() == "or":
-            return Token("OR", "or")
-        elif result.lower() == "not":
-            return Token("NOT", "not")
-        else:
-            raise Exception(f"Invalid logical operator: {result}")
+        end = WORD_RUN.match(self.input_text, self.position).end()
+        result = self.input_text[self.position:end]
+        self.skip_to(end)
+
+        token = LOGICAL_WORDS.get(result.lower())
+        if token is None:
+            # interned: every occurrence of a name shares one string
+            token = Token("IDENTIFIER", sys.intern(result))
+        return token
+
+
+# The Lexer method that lexes a token starting with char
+def char_handler(char):
+    if char in PUNCTUATION:
+        return Lexer.punctuation
+    elif char == "*":
+        return Lexer.star
+    elif char.isspace():
+        return Lexer.skip_space
+    elif char.isdigit() or char == '.':
+        return Lexer.parse_number
+    elif char.isalpha():
+        return Lexer.parse_logical
+    else:
+        return Lexer.invalid
+
+
+# Precomputed for ASCII; other characters go through char_handler(). A
+# plain space, the most common character, skips straight to advance().
+HANDLERS = {chr(code): char_handler(chr(code)) for code in range(128)}
+HANDLERS[" "] = Lexer.advance
 
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.current_token = self.tokens.pop(0) if tokens else None
+        self.tokens = TokenStream(tokens)
+        self.current_token = self.tokens.advance()
 
     def error(self):
         print("Invalid syntax")
@@ -113,7 +155,7 @@ class Parser:
 
     def eat(self, token_type):
         if self.current_token.token_type == token_type:
-            self.current_token = self.tokens.pop(0) if self.tokens else None
+            self.current_token = self.tokens.advance()
         else:
             self.error()
 
@@ -131,6 +173,8 @@ class Parser:
             self.eat("NOT")
             result = not self.factor()
             return result
+        elif self.current_token.token_type == "IDENTIFIER":
+            unbound_identifier(self, self.current_token.value)
         else:
             self.error()
 
@@ -200,6 +244,125 @@ class Parser:
         return result
 
 
+def divide(left, right):
+    if right != 0:
+        return left / right
+    raise Exception("Division by zero")
+
+
+def modulo(left, right):
+    if right != 0:
+        return left % right
+    raise Exception("Modulo by zero")
+
+
+# Parser's grammar levels as one table, lowest precedence first. POWER is
+# left-associative like power(); NOT applies to a single factor.
+# Names only have values in vector mode (VectorParser bindings)
+def unbound_identifier(parser, name):
+    raise Exception(f"Unbound identifier: {name}")
+
+
+OPERATORS = OperatorTable(
+    binary={
+        "OR": (1, False, lambda left, right: left or right),
+        "AND": (2, False, lambda left, right: left and right),
+        "PLUS": (3, False, operator.add),
+        "MINUS": (3, False, operator.sub),
+        "MULTIPLY": (4, False, operator.mul),
+        "DIVIDE": (4, False, divide),
+        "MODULO": (4, False, modulo),
+        "POWER": (5, False, operator.pow),
+    },
+    prefix={"NOT": (6, operator.not_)},
+    operands=("INT", "FLOAT", "BOOL", "IDENTIFIER"),
+    lparen="LPAREN",
+    rparen="RPAREN",
+    resolve={"IDENTIFIER": unbound_identifier},
+)
+EXPR_PRECEDENCE = 3
+
+
+# Same language as Parser, evaluated without recursion (see precedence.py)
+class PrecedenceParser(Parser):
+    def expr(self):
+        return evaluate(self, OPERATORS, EXPR_PRECEDENCE)
+
+    def logical_or(self):
+        return evaluate(self, OPERATORS)
+
+
+# Evaluates over NumPy arrays: VectorParser(tokens, {"x": xs}).evaluate()
+class VectorParser(VectorEvaluation, Parser):
+    def top_level(self):
+        return self.logical_or()
+
+    def factor(self):
+        if self.current_token.token_type == "IDENTIFIER":
+            name = self.current_token.value
+            self.eat("IDENTIFIER")
+            return self.lookup(name)
+        elif self.current_token.token_type == "NOT":
+            self.eat("NOT")
+            return self.np.logical_not(self.factor())
+        return super().factor()
+
+    def power(self):
+        result = self.factor()
+
+        while self.current_token and self.current_token.token_type == "POWER":
+            self.eat("POWER")
+            result = self.np.power(result, self.factor())
+
+        return result
+
+    def term(self):
+        result = self.power()
+
+        while self.current_token and self.current_token.token_type in ("MULTIPLY", "DIVIDE", "MODULO"):
+            operator = self.current_token.token_type
+            self.eat(operator)
+            if operator == "MULTIPLY":
+                result = self.np.multiply(result, self.power())
+            elif operator == "DIVIDE":
+                result = self.divide(result, self.power())
+            else:
+                result = self.modulo(result, self.power())
+
+        return result
+
+    def expr(self):
+        result = self.term()
+
+        while self.current_token and self.current_token.token_type in ("PLUS", "MINUS"):
+            operator = self.current_token.token_type
+            self.eat(operator)
+            if operator == "PLUS":
+                result = self.np.add(result, self.term())
+            else:
+                result = self.np.subtract(result, self.term())
+
+        return result
+
+    def logical_and(self):
+        result = self.expr()
+
+        while self.current_token and self.current_token.token_type == "AND":
+            self.eat("AND")
+            result = self.np.logical_and(result, self.expr())
+
+        return result
+
+    def logical_or(self):
+        result = self.logical_and()
+
+        while self.current_token and self.current_token.token_type == "OR":
+            self.eat("OR")
+            result = self.np.logical_or(result, self.logical_and())
+
+        return result
+
+
 class MathCompilerGUI:
     def __init__(self, master):
         self.master = master
@@ -220,34 +383,78 @@ class MathCompilerGUI:
         self.token_label = Label(master, text="Token Table:")
         self.token_label.pack()
 
-        self.token_text = scrolledtext.ScrolledText(master, width=40, height=10)
-        self.token_text.pack()
+        # Renders only the rows in view, however many tokens there are
+        self.token_view = VirtualTableView(master, width=40, height=10)
+        self.token_view.pack()
 
         self.compile_button = Button(master, text="Compile", command=self.compile_expression)
         self.compile_button.pack()
 
+        # Repeat compiles of unchanged text are served from here
+        self.cache = CompileCache()
+        self.cache_label = Label(master, text=str(self.cache))
+        self.cache_label.pack()
+
+        # Compiles run off the Tk thread; the label shows latency and UI stalls
+        self.compiler = BackgroundCompiler(master)
+        self.status_label = Label(master, text=str(self.compiler))
+        self.status_label.pack()
+
     def compile_expression(self):
         input_expression = self.expression_entry.get()
 
-        # Lexical Analysis
-        lexer = Lexer(input_expression)
-        tokens = lexer.lex()
+        compiled = self.cache.get(input_expression)
+        if compiled is not None:
+            self.compiler.supersede()
+            self.show_compiled(compiled)
+            return
 
-        # Display Token Table
-        token_table = "\nToken Table:\n| Type              | Value      |\n|-------------------|------------|"
-        for token in tokens:
-            token_table += f"\n{token}"
+        self.compiler.submit(
+            compile_source, (input_expression,),
+            lambda compiled: self.finish_compile(input_expression, compiled), self.show_error,
+        )
+        self.status_label.config(text="Compiling...")
 
-        self.token_text.delete(1.0, tk.END)
-        self.token_text.insert(tk.END, token_table)
+    def finish_compile(self, input_expression, compiled):
+        self.cache.put(input_expression, compiled, entry_size(*compiled))
+        self.show_compiled(compiled)
 
-        # Parsing and Evaluation
-        parser = Parser(tokens.copy())
-        result = parser.expr()
+    def show_compiled(self, compiled):
+        tokens, token_table, result = compiled
+
+        self.token_view.show(token_table)
 
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(tk.END, str(result))
 
+        self.cache_label.config(text=str(self.cache))
+        self.status_label.config(text=str(self.compiler))
+
+    def show_error(self, error):
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, f"Error: {error}")
+        self.status_label.config(text=str(self.compiler))
+
+
+def compile_source(input_expression, profiler=NULL_PROFILER):
+    # Lexical Analysis
+    with profiler.stage("lex") as stage:
+        lexer = Lexer(input_expression)
+        tokens = lexer.lex()
+        stage.count, stage.unit = len(tokens), "tokens"
+
+    # Token Table
+    with profiler.stage("token table") as stage:
+        token_table = TokenTable(tokens)
+        stage.count, stage.unit = len(token_table), "rows"
+
+    # Parsing and Evaluation
+    with profiler.stage("parse") as stage:
+        parser = PrecedenceParser(tokens)
+        result = parser.logical_or()
+
+    return tokens, token_table, result
+
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,33 @@
+import mmap
+
+from tokenbuffer import TokenBuffer
+
+
+# Read-only mapping of a file; empty files (which mmap rejects) map to b""
+def open_mapped(path):
+    with open(path, "rb") as source:
+        try:
+            return mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b""
+
+
+# Tokenizes a bytes-like buffer (bytes, mmap) without decoding it. pattern is
+# a bytes regex whose named groups are token kinds, SKIP for whitespace;
+# token_type(kind, text) gives the token type. Tokens are stored as spans in
+# a TokenBuffer, so values are only decoded when a token is read.
+def lex_buffer(data, pattern, token_type, decoders=None, encoding="utf-8"):
+    tokens = TokenBuffer(data, decoders, encoding)
+    position = 0
+    for match in pattern.finditer(data):
+        start = match.start()
+        if start != position:
+            break
+        position = match.end()
+        kind = match.lastgroup
+        if kind != "SKIP":
+            tokens.add_span(token_type(kind, match.group()), start, position)
+    if position < len(data):
+        char = bytes(data[position:position + 4]).decode(encoding, "replace")[0]
+        raise Exception(f"Invalid character: {char}")
+    return tokens
@@ -0,0 +1,123 @@
+# Operator-precedence expression evaluation with explicit stacks instead of
+# one Python call per grammar level (expr -> term -> power -> factor), so the
+# cost per token is flat and parenthesis depth is only limited by memory.
+
+
+class OperatorTable:
+    # binary: token type -> (precedence, right_assoc, func(left, right))
+    # prefix: token type -> (precedence, func(operand))
+    # operands: token types whose value is pushed as is, or as
+    # resolve[token type](parser, value) for those in resolve (names looked
+    # up or checked against the parser's symbol table)
+    def __init__(self, binary, prefix, operands, lparen, rparen, resolve=None):
+        self.binary = binary
+        self.prefix = prefix
+        # stack entries: (precedence, func, is_binary)
+        self.binary_entries = {token_type: (precedence, func, True)
+                               for token_type, (precedence, right_assoc, func) in binary.items()}
+        self.prefix_entries = {token_type: (precedence, func, False)
+                               for token_type, (precedence, func) in prefix.items()}
+        self.operands = frozenset(operands)
+        self.resolve = resolve or {}
+        self.lparen = lparen
+        self.rparen = rparen
+
+
+# Applies the operators on top of the stack that bind at least as tightly as
+# an incoming operator of the given precedence; None marks a "(". Binary
+# entries are (precedence, func, True), prefix ones (precedence, func, False).
+def reduce(operands, operators, precedence, right_assoc=False):
+    while operators:
+        top = operators[-1]
+        if top is None or top[0] < precedence or (top[0] == precedence and right_assoc):
+            break
+        operators.pop()
+        if top[2]:
+            right = operands.pop()
+            operands[-1] = top[1](operands[-1], right)
+        else:
+            operands[-1] = top[1](operands[-1])
+
+
+# Evaluates one expression starting at parser.current_token, reading tokens
+# from an iterator over parser.tokens (a TokenStream). A missing operand goes
+# through parser.error() and evaluates to None, as in the recursive factor()
+# methods.
+# Binary operators below min_precedence end the expression unless inside
+# parentheses, which lets a parser expose a lower grammar level (e.g. expr()
+# without AND/OR).
+def evaluate(parser, table, min_precedence=0):
+    binary = table.binary
+    binary_entries = table.binary_entries
+    prefix_entries = table.prefix_entries
+    operand_types = table.operands
+    resolve = table.resolve
+    lparen = table.lparen
+    rparen = table.rparen
+    remaining = iter(parser.tokens)
+    operands = []
+    operators = []
+    depth = 0
+    token = parser.current_token
+
+    while True:
+        # Operand position: any prefix operators and "(", then a value
+        token_type = token.token_type if token else None
+        while token_type in prefix_entries or token_type == lparen:
+            if token_type == lparen:
+                operators.append(None)
+                depth += 1
+            else:
+                operators.append(prefix_entries[token_type])
+            token = next(remaining, None)
+            token_type = token.token_type if token else None
+        if token_type in operand_types:
+            value = token.value
+            token = next(remaining, None)
+            if token_type in resolve:
+                # past the operand first, as the recursive factor() methods are
+                parser.current_token = token
+                value = resolve[token_type](parser, value)
+            operands.append(value)
+        else:
+            parser.current_token = token
+            parser.error()
+            operands.append(None)
+
+        # Operator position: ")" closes a group, a binary operator continues
+        while True:
+            token_type = token.token_type if token else None
+            entry = binary.get(token_type)
+            if entry is not None and (depth or entry[0] >= min_precedence):
+                break
+            if token_type == rparen and depth:
+                reduce(operands, operators, float("-inf"))
+                operators.pop()
+                depth -= 1
+                token = next(remaining, None)
+                continue
+            parser.current_token = token
+            # Unclosed parentheses: eat() reports the missing ")" the way
+            # the recursive parsers do
+            while depth:
+                reduce(operands, operators, float("-inf"))
+                operators.pop()
+                depth -= 1
+                parser.eat(rparen)
+            reduce(operands, operators, float("-inf"))
+            return operands[0]
+
+        # reduce() inlined: this runs once per binary operator
+        precedence, right_assoc, _ = entry
+        while operators:
+            top = operators[-1]
+            if top is None or top[0] < precedence or (top[0] == precedence and right_assoc):
+                break
+            operators.pop()
+            if top[2]:
+                right = operands.pop()
+                operands[-1] = top[1](operands[-1], right)
+            else:
+                operands[-1] = top[1](operands[-1])
+        operators.append(binary_entries[token_type])
+        token = next(remaining, None)
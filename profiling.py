@@ -0,0 +1,116 @@
+import json
+import time
+import tracemalloc
+
+
+class Stage:
+    # One timed pipeline stage. Use as a context manager; the caller may set
+    # count/unit inside the block (e.g. the number of tokens produced).
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.count = None
+        self.unit = None
+        self.wall = self.cpu = 0.0
+        self.alloc_bytes = self.peak_bytes = self.alloc_blocks = None
+
+    def __enter__(self):
+        if self.profiler.trace_memory:
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.snapshot = tracemalloc.take_snapshot()
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = time.process_time() - self.cpu
+        if self.profiler.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.alloc_bytes = current - self.memory
+            self.peak_bytes = peak - self.memory
+            # net number of live blocks the stage left behind
+            stats = tracemalloc.take_snapshot().compare_to(self.snapshot, "filename")
+            self.alloc_blocks = sum(stat.count_diff for stat in stats)
+            self.snapshot = None
+            if self.started_tracing:
+                tracemalloc.stop()
+        self.profiler.stages.append(self)
+        return False
+
+    def as_dict(self):
+        return {
+            "stage": self.name, "wall": self.wall, "cpu": self.cpu,
+            "count": self.count, "unit": self.unit,
+            "alloc_bytes": self.alloc_bytes, "peak_bytes": self.peak_bytes, "alloc_blocks": self.alloc_blocks,
+        }
+
+
+class Profiler:
+    # Collects Stage records for one compile. trace_memory adds tracemalloc
+    # numbers, which slows the stages it measures down considerably.
+    enabled = True
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    def stage(self, name):
+        return Stage(self, name)
+
+    def report(self):
+        return [stage.as_dict() for stage in self.stages]
+
+    def to_json(self):
+        return json.dumps(self.report(), indent=1)
+
+    def __str__(self):
+        lines = ["| Stage            | Wall ms  | CPU ms   | Count          | Alloc KB | Peak KB  | Blocks   |",
+                 "|------------------|----------|----------|----------------|----------|----------|----------|"]
+        for stage in self.stages:
+            count = "" if stage.count is None else f"{stage.count} {stage.unit or ''}".strip()
+            alloc = "" if stage.alloc_bytes is None else f"{stage.alloc_bytes / 1024:.1f}"
+            peak = "" if stage.peak_bytes is None else f"{stage.peak_bytes / 1024:.1f}"
+            blocks = "" if stage.alloc_blocks is None else str(stage.alloc_blocks)
+            lines.append(f"| {stage.name:<16} | {stage.wall * 1000:<8.3f} | {stage.cpu * 1000:<8.3f} | "
+                         f"{count:<14} | {alloc:<8} | {peak:<8} | {blocks:<8} |")
+        total = sum(stage.wall for stage in self.stages)
+        lines.append(f"Total: {total * 1000:.3f} ms")
+        return "\n".join(lines)
+
+
+class NullStage:
+    count = unit = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class NullProfiler:
+    # Default for every pipeline: stage() hands back one shared no-op context
+    # manager, so uninstrumented compiles only pay for a method call per stage.
+    enabled = False
+    stages = ()
+
+    def stage(self, name):
+        return NULL_STAGE
+
+    def report(self):
+        return []
+
+    def to_json(self):
+        return "[]"
+
+    def __str__(self):
+        return "Profiling disabled"
+
+
+NULL_STAGE = NullStage()
+NULL_PROFILER = NullProfiler()
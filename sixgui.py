@@ -1,7 +1,20 @@
+import re
+import sys
 import tkinter as tk
-from tkinter import Label, Button, scrolledtext
+from tkinter import Label, Button, Checkbutton, scrolledtext
+
+from backgroundcompile import BackgroundCompiler
+from bytecode import DeclarationCompilation
+from compilecache import CompileCache, entry_size
+from profiling import NULL_PROFILER, Profiler
+from tableview import VirtualTableView
+from tokentable import TokenTable
+from symboltable import SymbolTable
+from tokenstream import TokenStream
 
 class Token:
+    __slots__ = ("token_type", "value")
+
     def __init__(self, token_type, value):
         self.token_type = token_type
         self.value = value
@@ -9,11 +22,31 @@ class Token:
     def __str__(self):
         return f"| {self.token_type:<18} | {str(self.value):<10} |"
 
+# Number and identifier runs are found with one match each and sliced from
+# the text, instead of built up a character at a time through advance()
+NUMBER_RUN = re.compile(r'[\d.]*')
+WORD_RUN = re.compile(r'\w*')
+SPACE_RUN = re.compile(r'\s*')
+
+KEYWORDS = {
+    "int": "TYPE", "float": "TYPE", "double": "TYPE", "char": "TYPE", "void": "TYPE",
+    "return": "RETURN", "if": "IF", "else": "ELSE", "while": "WHILE", "for": "FOR"
+}
+
+# Tokens are never modified after lexing, so every occurrence of a
+# punctuation character or keyword shares one Token. These tables (and
+# HANDLERS below) are built once at import and never changed.
+PUNCTUATION = {char: Token(token_type, char) for char, token_type in (
+    ("+", "+"), ("-", "-"), ("*", "*"), ("/", "/"), ("%", "%"), ("=", "ASSIGNMENT"), (";", "SEMICOLON"),
+    ("{", "{"), ("}", "}"), ("(", "("), (")", ")"), (",", "COMMA"),
+)}
+KEYWORD_TOKENS = {word: Token(token_type, word) for word, token_type in KEYWORDS.items()}
+
 class Lexer:
-    def __init__(self, input_text):
+    def __init__(self, input_text, position=0):
         self.input_text = input_text
-        self.position = 0
-        self.current_char = self.input_text[self.position]
+        self.position = position
+        self.current_char = self.input_text[position] if position < len(input_text) else None
 
     def advance(self):
         self.position += 1
@@ -22,42 +55,58 @@ class Lexer:
         else:
             self.current_char = None
 
-    def lex(self):
-        tokens = []
+    def skip_to(self, position):
+        self.position = position
+        self.current_char = self.input_text[position] if position < len(self.input_text) else None
+
+    def lex(self, tokens=None):
+        if tokens is None:
+            tokens = []
         errors = []
-        while self.current_char is not None:
-            if self.current_char.isspace():
-                self.advance()
-            elif self.current_char.isdigit():
-                tokens.append(self.parse_number())
-            elif self.current_char.isalpha():
-                tokens.append(self.parse_keyword())
-            elif self.current_char in "+-*/%":
-                tokens.append(Token(self.current_char, self.current_char))
-                self.advance()
-            elif self.current_char == "=":
-                tokens.append(Token("ASSIGNMENT", "="))
-                self.advance()
-            elif self.current_char == ";":
-                tokens.append(Token("SEMICOLON", ";"))
-                self.advance()
-            elif self.current_char in "{}()":
-                tokens.append(Token(self.current_char, self.current_char))
-                self.advance()
-            elif self.current_char == ",":
-                tokens.append(Token("COMMA", ","))
-                self.advance()
+        for start, end, token, error in self.scan():
+            if error is None:
+                tokens.append(token)
             else:
-                errors.append(f"Invalid character: {self.current_char}")
-                self.advance()
+                errors.append(error)
 
         return tokens, errors
 
+    # Yields (start, end, token, error) for each token or invalid character
+    def scan(self):
+        handlers = HANDLERS
+        while self.current_char is not None:
+            start = self.position
+            handler = handlers.get(self.current_char) or char_handler(self.current_char)
+            if handler is None:
+                error = f"Invalid character: {self.current_char}"
+                self.advance()
+                yield start, self.position, None, error
+                continue
+            try:
+                token = handler(self)
+            except ValueError:  # int()/float() of a run like "1.." or "²"
+                if self.position == start:
+                    self.advance()
+                yield start, self.position, None, f"Invalid number: {self.input_text[start:self.position]}"
+                continue
+            if token is not None:
+                yield start, self.position, token, None
+
+    # a single space is one advance(); longer runs (indentation) one match
+    def skip_space(self):
+        self.advance()
+        if self.current_char is not None and self.current_char.isspace():
+            self.skip_to(SPACE_RUN.match(self.input_text, self.position).end())
+
+    def punctuation(self):
+        token = PUNCTUATION[self.current_char]
+        self.advance()
+        return token
+
     def parse_number(self):
-        result = ""
-        while self.current_char is not None and (self.current_char.isdigit() or self.current_char == '.'):
-            result += self.current_char
-            self.advance()
+        end = NUMBER_RUN.match(self.input_text, self.position).end()
+        result = self.input_text[self.position:end]
+        self.skip_to(end)
 
         if '.' in result:
             return Token("NUMBER", float(result))
@@ -65,51 +114,244 @@ class Lexer:
             return Token("NUMBER", int(result))
 
     def parse_keyword(self):
-        result = ""
-        while self.current_char is not None and (self.current_char.isalnum() or self.current_char == '_'):
-            result += self.current_char
-            self.advance()
+        end = WORD_RUN.match(self.input_text, self.position).end()
+        result = self.input_text[self.position:end]
+        self.skip_to(end)
+
+        token = KEYWORD_TOKENS.get(result)
+        if token is None:
+            # interned: every occurrence of a name shares one string
+            token = Token("IDENTIFIER", sys.intern(result))
+        return token
+
+# The Lexer method that lexes a token starting with char, or None if no
+# token starts with it
+def char_handler(char):
+    if char in PUNCTUATION:
+        return Lexer.punctuation
+    elif char.isspace():
+        return Lexer.skip_space
+    elif char.isdigit():
+        return Lexer.parse_number
+    elif char.isalpha():
+        return Lexer.parse_keyword
+    return None
+
+# Precomputed for ASCII; other characters go through char_handler(). A
+# plain space, the most common character, skips straight to advance().
+HANDLERS = {chr(code): char_handler(chr(code)) for code in range(128)}
+HANDLERS[" "] = Lexer.advance
+
+class IncrementalLexer:
+    # Keeps the scan of the previous text and, on update(), re-lexes only from
+    # the last token boundary before the edit until the new tokens line up with
+    # the old ones again; the untouched tail is spliced back in.
+    #
+    # Offsets after the last edit are stored lazily, gap-buffer style: entries
+    # at index >= gap hold (true offset - delta), so an edit only pays for the
+    # entries between it and the previous edit.
+    def __init__(self, input_text=""):
+        self.text = ""
+        self.starts = []
+        self.ends = []
+        self.items = []  # Token, or the error message for an invalid character
+        self.gap = 0
+        self.delta = 0
+        self.relexed = 0  # items produced by the last update, for monitoring
+        self.update(input_text)
+
+    def move_gap(self, index):
+        if index > self.gap:
+            for i in range(self.gap, index):
+                self.starts[i] += self.delta
+                self.ends[i] += self.delta
+        else:
+            for i in range(index, self.gap):
+                self.starts[i] -= self.delta
+                self.ends[i] -= self.delta
+        self.gap = index
+
+    def update(self, new_text):
+        old_text = self.text
+        if new_text == old_text:
+            return
+        prefix = common_prefix(old_text, new_text)
+        suffix = common_suffix(old_text, new_text, prefix)
+        self.edit(prefix, len(old_text) - prefix - suffix, new_text[prefix:len(new_text) - suffix], new_text)
+
+    # Replaces old_length characters at start with inserted
+    def edit(self, start, old_length, inserted, new_text=None):
+        if new_text is None:
+            new_text = self.text[:start] + inserted + self.text[start + old_length:]
+        change = len(inserted) - old_length
+        edit_end = start + len(inserted)
+
+        # First item that ends at or after the edit; everything before it is
+        # terminated by a character the edit did not touch.
+        first = self.find_end(start)
+        self.move_gap(first)  # offsets keep their meaning, only storage moves
+        restart = self.ends[first - 1] if first else 0
+
+        # scanned into locals; nothing observable changes until it finishes
+        delta = self.delta + change
+        new_starts, new_ends, new_items = [], [], []
+        resume = len(self.items)
+        for token_start, token_end, token, error in Lexer(new_text, restart).scan():
+            if token_start >= edit_end:
+                # the scan is context free: an old item starting here is
+                # followed by exactly the same items as before
+                old_index = self.find_start(token_start - delta, first)
+                if old_index is not None:
+                    resume = old_index
+                    break
+            new_starts.append(token_start - delta)
+            new_ends.append(token_end - delta)
+            new_items.append(token if error is None else error)
+
+        self.delta = delta
+        self.starts[first:resume] = new_starts
+        self.ends[first:resume] = new_ends
+        self.items[first:resume] = new_items
+        self.text = new_text
+        self.relexed = len(new_items)
+
+    def true_offset(self, offsets, index):
+        return offsets[index] + (self.delta if index >= self.gap else 0)
+
+    def find_end(self, offset):
+        lo, hi = 0, len(self.items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.true_offset(self.ends, mid) < offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # Index >= lo of the item whose stored start equals stored_offset, or None
+    def find_start(self, stored_offset, lo):
+        hi = len(self.items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.starts[mid] < stored_offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.items) and self.starts[lo] == stored_offset:
+            return lo
+        return None
+
+    def lex(self):
+        tokens = [item for item in self.items if not isinstance(item, str)]
+        errors = [item for item in self.items if isinstance(item, str)]
+        return tokens, errors
+
+
+def common_prefix(a, b):
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.startswith(b[lo:mid], lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
 
-        keywords = {
-            "int": "TYPE", "float": "TYPE", "double": "TYPE", "char": "TYPE", "void": "TYPE",
-            "return": "RETURN", "if": "IF", "else": "ELSE", "while": "WHILE", "for": "FOR"
-        }
 
-        return Token(keywords.get(result, "IDENTIFIER"), result)
+def common_suffix(a, b, limit):
+    lo, hi = 0, min(len(a), len(b)) - limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.endswith(b[len(b) - mid:len(b) - lo], 0, len(a) - lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+# Value of a failed declaration, and of any expression that reads one
+FAILED = object()
+
+# Where synchronize() stops skipping
+SYNC_TOKENS = ("SEMICOLON", "RIGHT_BRACE", "}", "TYPE", "LEFT_BRACE", "{")
+
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.current_token = self.tokens.pop(0) if tokens else None
-        self.variables = {}
+        self.tokens = TokenStream(tokens)
+        self.current_token = self.tokens.advance()
+        self.variables = SymbolTable()
+        self.errors = None  # a list while parse() is collecting errors
+        self.failed = set()  # slots of failed declarations (see record())
 
     def error(self, message="Invalid syntax"):
         raise Exception(message)
 
+    # Panic mode: drop tokens up to and including the next SEMICOLON, or up
+    # to a token that starts a statement (a type or an opening brace) or a
+    # closing brace, which is left for the enclosing block() to eat; so a
+    # missing ";" does not swallow the statement after it. start is the
+    # stream position where the failed statement began; if the statement
+    # consumed nothing, its first token is dropped regardless, so every
+    # error moves the parser forward. A stray closing brace is the whole
+    # error: parsing resumes right after it.
+    def synchronize(self, start):
+        if self.tokens.position == start and self.current_token:
+            stray_brace = self.current_token.token_type in ("RIGHT_BRACE", "}")
+            self.current_token = self.tokens.advance()
+            if stray_brace:
+                return
+        while self.current_token and self.current_token.token_type not in SYNC_TOKENS:
+            self.current_token = self.tokens.advance()
+        if self.current_token and self.current_token.token_type == "SEMICOLON":
+            self.current_token = self.tokens.advance()
+
+    # statement(), except that while parse() collects errors a failing
+    # statement is recorded and skipped instead of ending the parse
+    def checked_statement(self):
+        if self.errors is None:
+            self.statement()
+            return
+        start = self.tokens.position
+        try:
+            self.statement()
+        except Exception as e:
+            self.errors.append(str(e))
+            self.synchronize(start)
+
     def eat(self, token_type):
         while self.current_token and self.current_token.token_type == "ASSIGNMENT" and token_type == "SEMICOLON":
-            self.current_token = self.tokens.pop(0) if self.tokens else None
+            self.current_token = self.tokens.advance()
 
         if self.current_token and self.current_token.token_type == token_type:
-            self.current_token = self.tokens.pop(0) if self.tokens else None
-        elif token_type == "SEMICOLON" and (
+            self.current_token = self.tokens.advance()
+        elif token_type == "SEMICOLON" and self.current_token and (
                 self.current_token.token_type == "IDENTIFIER" or
                 self.current_token.token_type == "NUMBER" or
                 self.current_token.token_type in ("+", "-", "*", "/") or
-                (self.current_token.token_type == "ASSIGNMENT" and self.tokens[0].token_type == "%")):
+                (self.current_token.token_type == "ASSIGNMENT" and
+                 getattr(self.tokens.peek(), "token_type", None) == "%")):
             return
+        elif self.current_token is None:
+            self.error(f"Expected {token_type}, but got end of input")
         else:
             self.error(f"Expected {token_type}, but got {self.current_token.token_type}")
 
     def factor(self):
-        if self.current_token.token_type == "NUMBER":
+        if self.current_token is None:
+            self.error("Unexpected end of input")
+        elif self.current_token.token_type == "NUMBER":
             result = self.current_token.value
             self.eat("NUMBER")
             return result
         elif self.current_token.token_type == "IDENTIFIER":
-            result = self.variables.get(self.current_token.value)
+            # eaten before the lookup, so an undeclared name still moves the parser on
+            name = self.current_token.value
             self.eat("IDENTIFIER")
-            return result
+            slot = self.variables.resolve(name)
+            if slot in self.failed:
+                return FAILED
+            return self.variables.values[slot]
         elif self.current_token.token_type == "LEFT_PAREN":
             self.eat("LEFT_PAREN")
             result = self.expr()
@@ -130,7 +372,9 @@ class Parser:
             self.eat(operator)
             operand = self.factor()
 
-            if operator == "*":
+            if result is FAILED or operand is FAILED:
+                result = FAILED  # a failed declaration, already reported
+            elif operator == "*":
                 result *= operand
             elif operator == "/":
                 if operand != 0:
@@ -148,7 +392,9 @@ class Parser:
             self.eat(operator)
             operand = self.term()
 
-            if operator == "+":
+            if result is FAILED or operand is FAILED:
+                result = FAILED
+            elif operator == "+":
                 result += operand
             elif operator == "-":
                 result -= operand
@@ -160,19 +406,27 @@ class Parser:
             self.eat("SEMICOLON")
         elif self.current_token.token_type == "TYPE":
             self.variable_declaration()
+        elif self.current_token.token_type in ("LEFT_BRACE", "{"):
+            self.block()
         else:
             result = self.expr()
-            var_name = self.current_token.value
-            self.variables[var_name] = result
+            identifier = self.current_token
             self.eat("IDENTIFIER")
+            self.record(self.variables.store(identifier.value, None if result is FAILED else result), result)
             self.eat("SEMICOLON")
 
     def block(self):
-        if self.current_token.token_type == "LEFT_BRACE":
-            self.eat("LEFT_BRACE")
-            while self.current_token and self.current_token.token_type != "RIGHT_BRACE":
-                self.statement()
-            self.eat("RIGHT_BRACE")
+        # the lexer emits "{" / "}" as their own token types
+        if self.current_token.token_type in ("LEFT_BRACE", "{"):
+            close = "RIGHT_BRACE" if self.current_token.token_type == "LEFT_BRACE" else "}"
+            self.eat(self.current_token.token_type)
+            self.variables.enter_scope()
+            try:
+                while self.current_token and self.current_token.token_type != close:
+                    self.checked_statement()
+            finally:
+                self.variables.exit_scope()
+            self.eat(close)
         elif self.current_token.token_type == "SEMICOLON":
             self.eat("SEMICOLON")
         else:
@@ -181,26 +435,48 @@ class Parser:
     def variable_declaration(self):
         data_type = self.current_token.value
         self.eat("TYPE")
-        var_name = self.current_token.value
+        identifier = self.current_token
         self.eat("IDENTIFIER")
+        var_name = identifier.value
 
-        if self.current_token.token_type == "ASSIGNMENT":
+        if self.current_token is None:
+            self.error("Unexpected end of input")
+        elif self.current_token.token_type == "ASSIGNMENT":
             self.eat("ASSIGNMENT")
-            self.variables[var_name] = self.expr()
+            try:
+                value = self.expr()
+            except Exception:
+                # declared all the same, so later uses don't report it again
+                self.declare_failed(var_name)
+                raise
+            self.record(self.variables.declare(var_name, None if value is FAILED else value), value)
             self.eat("SEMICOLON")
         elif self.current_token.token_type == "SEMICOLON":
-            self.variables[var_name] = None  # Default value for the variable
+            self.record(self.variables.declare(var_name, None), None)  # Default value for the variable
             self.eat("SEMICOLON")
         else:
+            self.declare_failed(var_name)
             self.error()
 
+    # Slots whose declaration failed hold None in the table, like an
+    # uninitialized variable, but read as FAILED so arithmetic on them is
+    # skipped instead of reported a second time
+    def record(self, slot, value):
+        if value is FAILED:
+            self.failed.add(slot)
+        else:
+            self.failed.discard(slot)
+
+    def declare_failed(self, name):
+        self.record(self.variables.declare(name, None), FAILED)
+
+    # One pass over the whole input: every statement error is collected and
+    # parsing resumes after it (see synchronize())
     def parse(self):
-        errors = []
+        errors = self.errors = []
         while self.current_token:
-            try:
-                self.statement()
-            except Exception as e:
-                errors.append(str(e))
+            self.checked_statement()
+        self.errors = None
 
         # Display Identifier Table
         identifier_table = "\nIdentifier Table:\n| Identifier        | Value      |\n|-------------------|------------|"
@@ -209,6 +485,19 @@ class Parser:
 
         return identifier_table, errors
 
+# Parser that compiles to bytecode instead of interpreting: run with
+# bytecode.run(CompilingParser(tokens).compile())
+class CompilingParser(DeclarationCompilation, Parser):
+    pass
+
+
+def compile_bytecode(input_program):
+    tokens, errors = Lexer(input_program).lex()
+    if errors:
+        raise Exception(errors[0])
+    return CompilingParser(tokens).compile()
+
+
 class MathCompilerGUI:
     def __init__(self, master):
         self.master = master
@@ -219,6 +508,10 @@ class MathCompilerGUI:
 
         self.program_entry = scrolledtext.ScrolledText(master, width=40, height=10)
         self.program_entry.pack()
+
+        # Re-tokenizes only around each edit as the user types
+        self.lexer = IncrementalLexer()
+        self.program_entry.bind("<<Modified>>", self.on_edit)
         
         self.compile_button = Button(master, text="Compile", command=self.compile_program)
         self.compile_button.pack()
@@ -226,8 +519,9 @@ class MathCompilerGUI:
         self.token_label = Label(master, text="Token Table:")
         self.token_label.pack()
 
-        self.token_text = scrolledtext.ScrolledText(master, width=40, height=10)
-        self.token_text.pack()
+        # Renders only the rows in view, however many tokens there are
+        self.token_view = VirtualTableView(master, width=40, height=10)
+        self.token_view.pack()
 
         self.identifier_label = Label(master, text="Identifier Table:")
         self.identifier_label.pack()
@@ -241,39 +535,120 @@ class MathCompilerGUI:
         self.error_text = scrolledtext.ScrolledText(master, width=40, height=5)
         self.error_text.pack()
 
+        # Repeat compiles of unchanged text are served from here
+        self.cache = CompileCache()
+        self.cache_label = Label(master, text=str(self.cache))
+        self.cache_label.pack()
 
-    def compile_program(self):
-        input_program = self.program_entry.get("1.0", tk.END)
+        # Compiles run off the Tk thread; the label shows latency and UI stalls
+        self.compiler = BackgroundCompiler(master)
+        self.status_label = Label(master, text=str(self.compiler))
+        self.status_label.pack()
 
-        # Lexical Analysis
-        lexer = Lexer(input_program)
-        tokens, lex_errors = lexer.lex()
+        # Opt-in per-stage timings of the last compile
+        self.profile_enabled = tk.BooleanVar(master, False)
+        self.trace_memory = tk.BooleanVar(master, False)
+        self.profile_check = Checkbutton(master, text="Profile stages", variable=self.profile_enabled)
+        self.profile_check.pack()
+        self.memory_check = Checkbutton(master, text="Trace allocations (slow)", variable=self.trace_memory)
+        self.memory_check.pack()
 
-        # Display Token Table
-        token_table = "\nToken Table:\n| Type              | Value      |\n|-------------------|------------|"
-        for token in tokens:
-            token_table += f"\n{token}"
+        self.profile_text = scrolledtext.ScrolledText(master, width=72, height=7)
+        self.profile_text.pack()
 
-        self.token_text.delete(1.0, tk.END)
-        self.token_text.insert(tk.END, token_table)
+    def on_edit(self, event):
+        self.program_entry.edit_modified(False)
+        self.lexer.update(self.program_entry.get("1.0", tk.END))
 
-        # Parsing and Execution
-        parser = Parser(tokens.copy())
-        identifier_table, parse_errors = parser.parse()
+    def compile_program(self):
+        input_program = self.program_entry.get("1.0", tk.END)
+
+        compiled = self.cache.get(input_program)
+        if compiled is not None:
+            self.compiler.supersede()
+            self.show_compiled(compiled)
+            self.show_profile("Served from the compile cache")
+            return
+
+        profiler = NULL_PROFILER
+        if self.profile_enabled.get():
+            profiler = Profiler(trace_memory=self.trace_memory.get())
+
+        # Lexing is incremental and cheap, and the lexer belongs to the Tk
+        # thread; table building and parsing go to the worker.
+        with profiler.stage("lex") as stage:
+            self.lexer.update(input_program)
+            tokens, lex_errors = self.lexer.lex()
+            stage.count, stage.unit = len(tokens), "tokens"
+        self.compiler.submit(
+            compile_tokens, (tokens, lex_errors, profiler),
+            lambda compiled: self.finish_compile(input_program, compiled, profiler), self.show_error,
+        )
+        self.status_label.config(text="Compiling...")
+
+    def finish_compile(self, input_program, compiled, profiler=NULL_PROFILER):
+        self.cache.put(input_program, compiled, entry_size(*compiled))
+        self.show_compiled(compiled)
+        if profiler.enabled:
+            self.show_profile(str(profiler))
+
+    def show_profile(self, text):
+        self.profile_text.delete(1.0, tk.END)
+        self.profile_text.insert(tk.END, text)
+
+    def show_compiled(self, compiled):
+        tokens, token_table, identifier_table, error_messages = compiled
+
+        self.token_view.show(token_table)
 
         self.identifier_text.delete(1.0, tk.END)
         self.identifier_text.insert(tk.END, identifier_table)
 
-        # Display Errors
-        error_messages = "\nError Messages:\n"
-        if lex_errors or parse_errors:
-            error_messages += "\n".join(lex_errors + parse_errors)
-        else:
-            error_messages += "No errors."
-
         self.error_text.delete(1.0, tk.END)
         self.error_text.insert(tk.END, error_messages)
 
+        self.cache_label.config(text=str(self.cache))
+        self.status_label.config(text=str(self.compiler))
+
+    def show_error(self, error):
+        self.error_text.delete(1.0, tk.END)
+        self.error_text.insert(tk.END, f"\nError Messages:\n{error}")
+        self.status_label.config(text=str(self.compiler))
+
+
+def compile_source(input_program, lexer=None, profiler=NULL_PROFILER):
+    # Lexical Analysis (incremental when given the editor's IncrementalLexer)
+    with profiler.stage("lex") as stage:
+        if lexer is None:
+            lexer = Lexer(input_program)
+        else:
+            lexer.update(input_program)
+        tokens, lex_errors = lexer.lex()
+        stage.count, stage.unit = len(tokens), "tokens"
+    return compile_tokens(tokens, lex_errors, profiler)
+
+
+def compile_tokens(tokens, lex_errors, profiler=NULL_PROFILER):
+    # Token Table
+    with profiler.stage("token table") as stage:
+        token_table = TokenTable(tokens)
+        stage.count, stage.unit = len(token_table), "rows"
+
+    # Parsing and Execution
+    with profiler.stage("parse") as stage:
+        parser = Parser(tokens)
+        identifier_table, parse_errors = parser.parse()
+        stage.count, stage.unit = len(parser.variables), "names"
+
+    # Errors
+    error_messages = "\nError Messages:\n"
+    if lex_errors or parse_errors:
+        error_messages += "\n".join(lex_errors + parse_errors)
+    else:
+        error_messages += "No errors."
+
+    return tokens, token_table, identifier_table, error_messages
+
 def main():
     root = tk.Tk()
     app = MathCompilerGUI(root)
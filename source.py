@@ -0,0 +1,19 @@
+CHUNK_SIZE = 64 * 1024
+
+
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    # Accepts a str, a file-like object with read(), or any iterable of str
+    # chunks, and yields non-empty chunks without reading ahead.
+    if isinstance(source, str):
+        if source:
+            yield source
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for chunk in source:
+            if chunk:
+                yield chunk
@@ -0,0 +1,73 @@
+from collections.abc import Mapping
+
+
+class SymbolTable(Mapping):
+    # Resolves names to integer slots; values live in a flat list indexed by
+    # slot. Scopes nest (enter_scope/exit_scope around a block): a name
+    # declared in an inner scope gets a new slot and shadows the outer one
+    # until the scope ends.
+    #
+    # resolve() is a single dict lookup: bindings maps every visible name to
+    # its slot, and each scope remembers the binding its declarations
+    # replaced so exit_scope() can put them back.
+    #
+    # As a Mapping it stands in for the old variables dict: each name maps
+    # to the value of its most recent declaration, in first-declaration order.
+    def __init__(self):
+        self.bindings = {}
+        self.scopes = [{}]
+        self.names = []
+        self.values = []
+        self.latest = {}
+
+    def enter_scope(self):
+        self.scopes.append({})
+
+    def exit_scope(self):
+        for name, shadowed in self.scopes.pop().items():
+            if shadowed is None:
+                del self.bindings[name]
+            else:
+                self.bindings[name] = shadowed
+
+    def declare(self, name, value=None):
+        scope = self.scopes[-1]
+        if name in scope:
+            # redeclared in the same scope: same slot, new value
+            slot = self.bindings[name]
+            self.values[slot] = value
+            return slot
+        scope[name] = self.bindings.get(name)
+        slot = len(self.values)
+        self.names.append(name)
+        self.values.append(value)
+        self.bindings[name] = slot
+        self.latest[name] = slot
+        return slot
+
+    def resolve(self, name):
+        slot = self.bindings.get(name)
+        if slot is None:
+            raise Exception(f"Undeclared identifier: {name}")
+        return slot
+
+    def lookup(self, name):
+        return self.values[self.resolve(name)]
+
+    # Assigns to the visible binding of name, declaring it in the current
+    # scope if there is none
+    def store(self, name, value=None):
+        slot = self.bindings.get(name)
+        if slot is None:
+            return self.declare(name, value)
+        self.values[slot] = value
+        return slot
+
+    def __getitem__(self, name):
+        return self.values[self.latest[name]]
+
+    def __iter__(self):
+        return iter(self.latest)
+
+    def __len__(self):
+        return len(self.latest)
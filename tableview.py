@@ -0,0 +1,70 @@
+import tkinter as tk
+
+
+class VirtualTableView(tk.Frame):
+    # Read-only table view that only puts the visible rows into its Text
+    # widget. The scrollbar is driven by row numbers rather than by the
+    # Text's own content, so showing a million-row table costs the same as
+    # showing ten. Takes any object with a header, __len__ and
+    # lines(start, stop) (see tokentable.TokenTable); show_text() displays
+    # plain text instead.
+    def __init__(self, master, width=40, height=10):
+        super().__init__(master)
+        self.height = height
+        self.table = None
+        self.first = 0
+
+        self.text = tk.Text(self, width=width, height=height, wrap="none")
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.text.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, "units"))
+        self.text.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+        self.text.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+        self.text.bind("<Prior>", lambda event: self.scroll(-1, "pages"))
+        self.text.bind("<Next>", lambda event: self.scroll(1, "pages"))
+
+    def visible_rows(self):
+        return max(1, self.height - self.table.header.count("\n") - 1)
+
+    def show(self, table):
+        self.table = table
+        self.first = 0
+        self.render()
+
+    def show_text(self, text):
+        self.table = None
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, text)
+        self.text.yview_moveto(0)
+        self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        if self.table is None:
+            return self.text.yview(*args)
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.table))
+            self.render()
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+    def scroll(self, count, what):
+        if self.table is None:
+            self.text.yview_scroll(count, what)
+        else:
+            self.first += count * (self.visible_rows() if what == "pages" else 1)
+            self.render()
+        return "break"
+
+    def render(self):
+        total = len(self.table)
+        visible = self.visible_rows()
+        self.first = max(0, min(self.first, total - visible))
+        lines = [self.table.header, *self.table.lines(self.first, self.first + visible)]
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, "\n".join(lines))
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
@@ -1,6 +1,28 @@
 import re
+import sys
+
+import binarycache
+import mappedsource
+from bytecode import DeclarationCompilation
+from source import CHUNK_SIZE, read_chunks
+from symboltable import SymbolTable
+from tokenstream import TokenStream
+from tokentable import TokenTable
+
+# Number and identifier runs are found with one match each and sliced from
+# the text, instead of built up a character at a time through advance()
+NUMBER_RUN = re.compile(r'[\d.]*')
+WORD_RUN = re.compile(r'\w*')
+SPACE_RUN = re.compile(r'\s*')
+
+KEYWORDS = {
+    "int": "TYPE", "float": "TYPE", "double": "TYPE", "char": "TYPE", "void": "TYPE",
+    "return": "RETURN", "if": "IF", "else": "ELSE", "while": "WHILE", "for": "FOR"
+}
 
 class Token:
+    __slots__ = ("token_type", "value")
+
     def __init__(self, token_type, value):
         self.token_type = token_type
         self.value = value
@@ -8,53 +30,95 @@ class Token:
     def __str__(self):
         return f"| {self.token_type:<18} | {str(self.value):<10} |"
 
+
+# Tokens are never modified after lexing, so every occurrence of a
+# punctuation character or keyword shares one Token. These tables (and
+# HANDLERS below) are built once at import and never changed.
+PUNCTUATION = {char: Token(token_type, char) for char, token_type in (
+    ("+", "+"), ("-", "-"), ("*", "*"), ("/", "/"), ("%", "%"), ("=", "ASSIGNMENT"), (";", "SEMICOLON"),
+    ("{", "{"), ("}", "}"), ("(", "("), (")", ")"), (",", "COMMA"),
+)}
+KEYWORD_TOKENS = {word: Token(token_type, word) for word, token_type in KEYWORDS.items()}
+
+
 class Lexer:
-    def __init__(self, input_text):
-        self.input_text = input_text
-        self.position = 0
-        self.current_char = self.input_text[self.position]
+    def __init__(self, input_text, chunk_size=CHUNK_SIZE):
+        # input_text may also be a file object or an iterable of chunks;
+        # only the chunk under the cursor is held in memory.
+        self.chunks = read_chunks(input_text, chunk_size)
+        self.input_text = ""
+        self.index = -1  # offset inside the current chunk
+        self.position = -1  # offset inside the whole input
+        self.current_char = None
+        self.advance()
 
     def advance(self):
         self.position += 1
-        if self.position < len(self.input_text):
-            self.current_char = self.input_text[self.position]
-        else:
-            self.current_char = None
+        self.index += 1
+        while self.index >= len(self.input_text):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.current_char = None
+                return
+            self.input_text = chunk
+            self.index = 0
+        self.current_char = self.input_text[self.index]
+
+    # The run of pattern characters from the cursor, one match per chunk; it
+    # only carries on into the next chunk if it reached the end of this one
+    def scan_run(self, pattern):
+        text = self.input_text
+        start = self.index
+        end = pattern.match(text, start).end()
+        if end < len(text):
+            self.position += end - start
+            self.index = end
+            self.current_char = text[end]
+            return text[start:end]
+
+        parts = []
+        while self.current_char is not None:
+            end = pattern.match(self.input_text, self.index).end()
+            parts.append(self.input_text[self.index:end])
+            at_chunk_end = end == len(self.input_text)
+            self.position += end - self.index - 1
+            self.index = end - 1
+            self.advance()
+            if not at_chunk_end:
+                break
+        return "".join(parts)
+
+    def lex(self, tokens=None):
+        if tokens is None:
+            tokens = []
+        for token in self.iter_tokens():
+            tokens.append(token)
+        return tokens
 
-    def lex(self):
-        tokens = []
+    def iter_tokens(self):
+        handlers = HANDLERS
         while self.current_char is not None:
-            if self.current_char.isspace():
-                self.advance()
-            elif self.current_char.isdigit():
-                tokens.append(self.parse_number())
-            elif self.current_char.isalpha():
-                tokens.append(self.parse_keyword())
-            elif self.current_char in "+-*/%":
-                tokens.append(Token(self.current_char, self.current_char))
-                self.advance()
-            elif self.current_char == "=":
-                tokens.append(Token("ASSIGNMENT", "="))
-                self.advance()
-            elif self.current_char == ";":
-                tokens.append(Token("SEMICOLON", ";"))
-                self.advance()
-            elif self.current_char in "{}()":
-                tokens.append(Token(self.current_char, self.current_char))
-                self.advance()
-            elif self.current_char == ",":
-                tokens.append(Token("COMMA", ","))
-                self.advance()
-            else:
-                raise Exception(f"Invalid character: {self.current_char}")
+            handler = handlers.get(self.current_char) or char_handler(self.current_char)
+            token = handler(self)
+            if token is not None:
+                yield token
 
-        return tokens
+    # a single space is one advance(); longer runs (indentation) one scan
+    def skip_space(self):
+        self.advance()
+        if self.current_char is not None and self.current_char.isspace():
+            self.scan_run(SPACE_RUN)
+
+    def punctuation(self):
+        token = PUNCTUATION[self.current_char]
+        self.advance()
+        return token
+
+    def invalid(self):
+        raise Exception(f"Invalid character: {self.current_char}")
 
     def parse_number(self):
-        result = ""
-        while self.current_char is not None and (self.current_char.isdigit() or self.current_char == '.'):
-            result += self.current_char
-            self.advance()
+        result = self.scan_run(NUMBER_RUN)
 
         if '.' in result:
             return Token("NUMBER", float(result))
@@ -62,23 +126,75 @@ class Lexer:
             return Token("NUMBER", int(result))
 
     def parse_keyword(self):
-        result = ""
-        while self.current_char is not None and (self.current_char.isalnum() or self.current_char == '_'):
-            result += self.current_char
-            self.advance()
-
-        keywords = {
-            "int": "TYPE", "float": "TYPE", "double": "TYPE", "char": "TYPE", "void": "TYPE",
-            "return": "RETURN", "if": "IF", "else": "ELSE", "while": "WHILE", "for": "FOR"
-        }
-
-        return Token(keywords.get(result, "IDENTIFIER"), result)
+        result = self.scan_run(WORD_RUN)
+
+        token = KEYWORD_TOKENS.get(result)
+        if token is None:
+            # interned: every occurrence of a name shares one string
+            token = Token("IDENTIFIER", sys.intern(result))
+        return token
+
+
+# The Lexer method that lexes a token starting with char
+def char_handler(char):
+    if char in PUNCTUATION:
+        return Lexer.punctuation
+    elif char.isspace():
+        return Lexer.skip_space
+    elif char.isdigit():
+        return Lexer.parse_number
+    elif char.isalpha():
+        return Lexer.parse_keyword
+    else:
+        return Lexer.invalid
+
+
+# Precomputed for ASCII; other characters go through char_handler(). A
+# plain space, the most common character, skips straight to advance().
+HANDLERS = {chr(code): char_handler(chr(code)) for code in range(128)}
+HANDLERS[" "] = Lexer.advance
+
+# Byte-level equivalent of Lexer.lex() for mmap'd files (see mappedsource.py)
+MAPPED_PATTERN = re.compile(
+    rb'(?P<SKIP>\s+)|(?P<NUMBER>\d[\d.]*)|(?P<WORD>[A-Za-z][A-Za-z0-9_]*)'
+    rb'|(?P<ASSIGNMENT>=)|(?P<SEMICOLON>;)|(?P<COMMA>,)|(?P<CHAR>[-+*/%{}()])'
+)
+
+def mapped_token_type(kind, text):
+    if kind == "WORD":
+        return KEYWORDS.get(text.decode("ascii"), "IDENTIFIER")
+    elif kind == "CHAR":
+        return text.decode("ascii")
+    elif kind == "NUMBER" and text.count(b'.') > 1:
+        # raised while scanning, as Lexer.lex() does, not when the token is read
+        number_value(text.decode("ascii"))
+    return kind
+
+def number_value(text):
+    return float(text) if '.' in text else int(text)
+
+def lex_buffer(data):
+    return mappedsource.lex_buffer(data, MAPPED_PATTERN, mapped_token_type, {"NUMBER": number_value})
+
+def lex_file(path):
+    return lex_buffer(mappedsource.open_mapped(path))
+
+# Tokens from the on-disk cache (binarycache.py) if this source was lexed
+# before by the same lexer, otherwise lexed and stored. The spec is the whole
+# module: the lexer also depends on the tables and handlers around it.
+def lex_cached(input_text, cache):
+    spec = binarycache.spec_digest(sys.modules[__name__])
+    tokens = cache.load_tokens("test.tokens", input_text, spec)
+    if tokens is None:
+        tokens = Lexer(input_text).lex()
+        cache.store_tokens("test.tokens", input_text, spec, tokens)
+    return tokens
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.current_token = self.tokens.pop(0) if tokens else None
-        self.variables = {}
+        self.tokens = TokenStream(tokens)
+        self.current_token = self.tokens.advance()
+        self.variables = SymbolTable()
 
     def error(self, message="Invalid syntax"):
         raise Exception(message)
@@ -86,15 +202,15 @@ class Parser:
     def eat(self, token_type):
         while self.current_token and self.current_token.token_type == "ASSIGNMENT" and token_type == "SEMICOLON":
             # Skip ASSIGNMENT tokens when expecting SEMICOLON
-            self.current_token = self.tokens.pop(0) if self.tokens else None
+            self.current_token = self.tokens.advance()
 
         if self.current_token and self.current_token.token_type == token_type:
-            self.current_token = self.tokens.pop(0) if self.tokens else None
+            self.current_token = self.tokens.advance()
         elif token_type == "SEMICOLON" and (
                 self.current_token.token_type == "IDENTIFIER" or
                 self.current_token.token_type == "NUMBER" or
                 self.current_token.token_type in ("+", "-", "*", "/") or
-                (self.current_token.token_type == "ASSIGNMENT" and self.tokens[0].token_type == "%")):
+                (self.current_token.token_type == "ASSIGNMENT" and self.tokens.peek().token_type == "%")):
             # Handle cases where an identifier, number, operator, or assignment with % is encountered without a semicolon
             return
         else:
@@ -106,9 +222,10 @@ class Parser:
             self.eat("NUMBER")
             return result
         elif self.current_token.token_type == "IDENTIFIER":
-            result = self.variables.get(self.current_token.value)
+            # eaten before the lookup, so an undeclared name still moves the parser on
+            name = self.current_token.value
             self.eat("IDENTIFIER")
-            return result
+            return self.variables.lookup(name)
         elif self.current_token.token_type == "LEFT_PAREN":
             self.eat("LEFT_PAREN")
             result = self.expr()
@@ -159,20 +276,28 @@ class Parser:
             self.eat("SEMICOLON")
         elif self.current_token.token_type == "TYPE":
             self.variable_declaration()
+        elif self.current_token.token_type in ("LEFT_BRACE", "{"):
+            self.block()
         else:
             result = self.expr()
             var_name = self.current_token.value
-            self.variables[var_name] = result
+            self.variables.store(var_name, result)
             self.eat("IDENTIFIER")
             self.eat("SEMICOLON")
 
     def block(self):
         print(f"Entering block() with current_token: {self.current_token.token_type}")
-        if self.current_token.token_type == "LEFT_BRACE":
-            self.eat("LEFT_BRACE")
-            while self.current_token and self.current_token.token_type != "RIGHT_BRACE":
-                self.statement()
-            self.eat("RIGHT_BRACE")
+        # the lexer emits "{" / "}" as their own token types
+        if self.current_token.token_type in ("LEFT_BRACE", "{"):
+            close = "RIGHT_BRACE" if self.current_token.token_type == "LEFT_BRACE" else "}"
+            self.eat(self.current_token.token_type)
+            self.variables.enter_scope()
+            try:
+                while self.current_token and self.current_token.token_type != close:
+                    self.statement()
+            finally:
+                self.variables.exit_scope()
+            self.eat(close)
         elif self.current_token.token_type == "SEMICOLON":
             self.eat("SEMICOLON")
         else:
@@ -186,10 +311,10 @@ class Parser:
 
         if self.current_token.token_type == "ASSIGNMENT":
             self.eat("ASSIGNMENT")
-            self.variables[var_name] = self.expr()
+            self.variables.declare(var_name, self.expr())
             self.eat("SEMICOLON")
         elif self.current_token.token_type == "SEMICOLON":
-            self.variables[var_name] = None  # Default value for the variable
+            self.variables.declare(var_name, None)  # Default value for the variable
             self.eat("SEMICOLON")
         else:
             self.error()
@@ -205,6 +330,14 @@ class Parser:
         for identifier, value in self.variables.items():
             print(f"| {identifier:<18} | {str(value):<10} |")
 
+# Parser that compiles to bytecode instead of interpreting: run with
+# bytecode.run(CompilingParser(tokens).compile())
+class CompilingParser(DeclarationCompilation, Parser):
+    pass
+
+def compile_bytecode(input_program):
+    return CompilingParser(Lexer(input_program).lex()).compile()
+
 def main():
     input_program = """
     int x = 5;
@@ -219,12 +352,9 @@ def main():
 
     # Display Token Table
     print("\nToken Table:")
-    print("| Type              | Value      |")
-    print("|-------------------|------------|")
-    for token in tokens:
-        print(token)
+    TokenTable(tokens).write(sys.stdout)
 
-    parser = Parser(tokens.copy())
+    parser = Parser(tokens)
     parser.parse()
     print("\nParsing and Execution completed successfully.")
 
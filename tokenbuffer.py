@@ -0,0 +1,117 @@
+from array import array
+
+# Token type names interned to small ints, shared by every buffer
+TYPE_NAMES = []
+TYPE_CODES = {}
+
+# value id of a token whose value is decoded from buffer.source on access
+LAZY = 0xFFFFFFFF
+
+
+def type_code(token_type):
+    code = TYPE_CODES.get(token_type)
+    if code is None:
+        TYPE_NAMES.append(token_type)
+        code = TYPE_CODES[token_type] = len(TYPE_NAMES) - 1
+    return code
+
+
+class TokenView:
+    # Materialized on indexing only; holds nothing but a buffer reference and a row
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def token_type(self):
+        return TYPE_NAMES[self.buffer.types[self.index]]
+
+    @property
+    def value(self):
+        value_id = self.buffer.value_ids[self.index]
+        if value_id == LAZY:
+            return self.buffer.decode(self.index)
+        return self.buffer.values[value_id]
+
+    @property
+    def start(self):
+        return self.buffer.starts[self.index]
+
+    @property
+    def end(self):
+        return self.buffer.ends[self.index]
+
+    def __str__(self):
+        return f"| {self.token_type:<18} | {str(self.value):<10} |"
+
+
+class TokenBuffer:
+    # Column store for tokens: type codes, offsets and value ids live in
+    # parallel arrays, repeated values are stored once in the value pool.
+    #
+    # With a source (bytes or mmap) tokens can instead be added as bare
+    # spans; their value is sliced and decoded when read, converted by the
+    # decoder registered for the token type, if any.
+    def __init__(self, source=None, decoders=None, encoding="utf-8"):
+        self.types = array('H')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.value_ids = array('L')
+        self.values = []
+        self.value_index = {}
+        self.source = source
+        self.encoding = encoding
+        self.decoders = {type_code(token_type): decoder for token_type, decoder in (decoders or {}).items()}
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        buffer = cls()
+        for token in tokens:
+            buffer.append(token)
+        return buffer
+
+    def add(self, token_type, value, start=-1, end=-1):
+        key = (value.__class__, value)  # keep 1, 1.0 and True apart
+        value_id = self.value_index.get(key)
+        if value_id is None:
+            value_id = self.value_index[key] = len(self.values)
+            self.values.append(value)
+        self.types.append(type_code(token_type))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.value_ids.append(value_id)
+
+    def add_span(self, token_type, start, end):
+        self.types.append(type_code(token_type))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.value_ids.append(LAZY)
+
+    def decode(self, index):
+        text = str(self.source[self.starts[index]:self.ends[index]], self.encoding)
+        decoder = self.decoders.get(self.types[index])
+        return text if decoder is None else decoder(text)
+
+    # list-compatible, so a buffer can be handed to Lexer.lex() as the sink
+    def append(self, token):
+        self.add(token.token_type, token.value, getattr(token, "start", -1), getattr(token, "end", -1))
+
+    def nbytes(self):
+        columns = (self.types, self.starts, self.ends, self.value_ids)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield TokenView(self, index)
@@ -0,0 +1,69 @@
+TRIM_THRESHOLD = 4096
+
+
+class TokenStream:
+    # Index-based cursor over a token list: peek/advance are O(1) and the
+    # underlying list is never mutated, so it can be shared.
+    #
+    # Any other iterable (e.g. Lexer.iter_tokens()) is pulled lazily and
+    # consumed tokens are dropped, so a streamed parse holds only the
+    # lookahead window.
+    def __init__(self, tokens):
+        if hasattr(tokens, "__getitem__"):
+            self.tokens = tokens
+            self.source = None
+        else:
+            self.tokens = []
+            self.source = iter(tokens)
+        self.base = 0  # absolute index of self.tokens[0]
+        self.position = 0
+
+    def fill(self, index):
+        while len(self.tokens) <= index:
+            token = next(self.source, None)
+            if token is None:
+                self.source = None
+                return False
+            self.tokens.append(token)
+        return True
+
+    def peek(self, offset=0):
+        index = self.position + offset - self.base
+        if index < len(self.tokens) or (self.source is not None and self.fill(index)):
+            return self.tokens[index]
+        return None
+
+    def advance(self):
+        token = self.peek()
+        if token is not None:
+            self.position += 1
+            if self.source is not None and self.position - self.base >= TRIM_THRESHOLD:
+                self.trim()
+        return token
+
+    # Yields the remaining tokens, advancing the cursor past each one as it
+    # is handed out; cheaper per token than calling advance() in a loop.
+    def __iter__(self):
+        if self.source is not None:
+            while True:
+                token = self.advance()
+                if token is None:
+                    return
+                yield token
+        tokens = self.tokens
+        base = self.base
+        for index in range(self.position - base, len(tokens)):
+            self.position = base + index + 1
+            yield tokens[index]
+
+    def trim(self):
+        del self.tokens[:self.position - self.base]
+        self.base = self.position
+
+    def __bool__(self):
+        return self.peek() is not None
+
+    def __len__(self):
+        if self.source is not None:
+            self.fill(float("inf"))
+        return len(self.tokens) + self.base - self.position
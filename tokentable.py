@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+
+HEADER = "| Type              | Value      |\n|-------------------|------------|"
+FORMATS = ("table", "csv", "tsv", "json")
+EXTENSIONS = {"table": "txt", "csv": "csv", "tsv": "tsv", "json": "json"}
+BATCH_ROWS = 4096
+
+
+def token_type(token):
+    return token.token_type if hasattr(token, "token_type") else token.type
+
+
+class TokenTable:
+    # Token table over a token list without building it as one string: rows
+    # are formatted on demand (row(i) for a view, write() in batches to a
+    # file), str() joins the whole table once. row defaults to the Token
+    # class's own __str__; skip drops token types (e.g. WHITESPACE).
+    def __init__(self, tokens, header=HEADER, row=str, skip=()):
+        if skip:
+            tokens = [token for token in tokens if token_type(token) not in skip]
+        self.tokens = tokens
+        self.header = header
+        self.format_row = row
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def row(self, index):
+        return self.format_row(self.tokens[index])
+
+    def lines(self, start=0, stop=None):
+        stop = len(self.tokens) if stop is None else min(stop, len(self.tokens))
+        format_row = self.format_row
+        tokens = self.tokens
+        for index in range(start, stop):
+            yield format_row(tokens[index])
+
+    def write(self, output, format="table"):
+        if format == "table":
+            output.write(self.header + "\n")
+            self.write_batches(output, (line + "\n" for line in self.lines()))
+        elif format in ("csv", "tsv"):
+            writer = csv.writer(output, delimiter="," if format == "csv" else "\t", lineterminator="\n")
+            writer.writerow(("type", "value"))
+            writer.writerows((token_type(token), token.value) for token in self.tokens)
+        elif format == "json":
+            output.write("[")
+            rows = (json.dumps({"type": token_type(token), "value": token.value}, default=str)
+                    for token in self.tokens)
+            self.write_batches(output, (("\n " if i == 0 else ",\n ") + row for i, row in enumerate(rows)))
+            output.write("\n]\n")
+        else:
+            raise Exception(f"Unknown table format: {format}")
+
+    @staticmethod
+    def write_batches(output, chunks):
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) == BATCH_ROWS:
+                output.write("".join(batch))
+                batch.clear()
+        output.write("".join(batch))
+
+    def render(self, format="table"):
+        output = io.StringIO()
+        self.write(output, format)
+        return output.getvalue()
+
+    def __str__(self):
+        return "\n".join([self.header, *self.lines()])
@@ -0,0 +1,50 @@
+class VectorEvaluation:
+    # Mixin for the recursive-descent Parser classes. Identifiers resolve to
+    # NumPy arrays, so every operator runs as one ufunc call over the whole
+    # column. Division and modulo by zero do not raise: the element becomes
+    # NaN and is flagged in self.invalid.
+    #
+    # numpy is imported on first use and kept as self.np, so the parsers
+    # that mix this in start without it.
+    def __init__(self, tokens, bindings):
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("Vector evaluation requires numpy") from None
+        self.np = np = numpy
+        super().__init__(tokens)
+        self.bindings = {name: np.asarray(values) for name, values in bindings.items()}
+        self.invalid = np.False_
+
+    def lookup(self, name):
+        if name not in self.bindings:
+            raise Exception(f"Unbound identifier: {name}")
+        return self.bindings[name]
+
+    def checked(self, ufunc, left, right):
+        np = self.np
+        zero = np.asarray(right) == 0
+        if not zero.any():
+            return ufunc(left, right)
+        self.invalid = self.invalid | zero
+        result = ufunc(left, np.where(zero, 1, right))
+        return np.where(zero, np.nan, result)
+
+    def divide(self, left, right):
+        return self.checked(self.np.true_divide, left, right)
+
+    def modulo(self, left, right):
+        return self.checked(self.np.mod, left, right)
+
+    # The parser's top-level rule; overridden where that is not expr()
+    def top_level(self):
+        return self.expr()
+
+    # Returns (values, invalid) where invalid is a boolean array of the same shape
+    def evaluate(self):
+        np = self.np
+        result = np.asarray(self.top_level())
+        if self.current_token:
+            raise Exception(f"Unexpected token: {self.current_token.token_type}")
+        shape = np.broadcast_shapes(result.shape, np.shape(self.invalid))
+        return np.broadcast_to(result, shape), np.broadcast_to(self.invalid, shape)